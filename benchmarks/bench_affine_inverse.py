@@ -0,0 +1,45 @@
+# Compare the ways of inverting affine keys modulo 0x110000:
+# - scan: the original loop over the whole affine_keys list
+# - closed form: extended Euclid, one key at a time
+# - batch: inverse_table, every key at once with Montgomery's trick
+#
+# Usage: python benchmarks/bench_affine_inverse.py
+import random
+from timeit import (
+    timeit,
+)
+
+from cryptoy.affine_cipher import (
+    affine_key_inverse,
+    affine_key_space,
+    compute_affine_keys,
+    inverse_table,
+)
+
+N = 0x110000
+
+
+def scan_inverse(a: int, affine_keys: list[int], n: int) -> int:
+    for key in affine_keys:
+        if (a * key) % n == 1:
+            return key
+    raise RuntimeError(f"{a} has no modular inverse")
+
+
+def main() -> None:
+    rng = random.Random(2600)  # noqa: S311
+    keys = affine_key_space(N)
+    sample = [keys[rng.randrange(len(keys))] for _ in range(20)]
+    affine_keys = compute_affine_keys(N)
+
+    scan = timeit(lambda: [scan_inverse(a, affine_keys, N) for a in sample], number=1)
+    closed_form = timeit(lambda: [affine_key_inverse(a, N) for a in sample], number=100)
+    batch = timeit(lambda: inverse_table(N), number=1)
+
+    print(f"scan:        {scan / len(sample) * 1e6:12.1f} us/key")
+    print(f"closed form: {closed_form / 100 / len(sample) * 1e6:12.1f} us/key")
+    print(f"batch:       {batch / len(keys) * 1e6:12.3f} us/key ({batch:.2f} s total)")
+
+
+if __name__ == "__main__":
+    main()
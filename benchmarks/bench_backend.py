@@ -0,0 +1,32 @@
+# Compare the codepoint backends on affine encryption of a large document.
+#
+# Usage: python benchmarks/bench_backend.py [size in characters]
+import sys
+from timeit import (
+    timeit,
+)
+
+from cryptoy import (
+    backend,
+)
+from cryptoy.affine_cipher import (
+    encrypt_optimized,
+)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4 * 2**20
+    msg = ("Les ennemis attaquent à l'aube, répliez-vous vers le pont. " * size)[:size]
+
+    for name in backend.available_backends():
+        if name == "auto":
+            continue
+        backend.set_backend(name)
+        elapsed = timeit(lambda: encrypt_optimized(msg, 13, 1234), number=3) / 3
+        print(
+            f"{name:>6}: {elapsed * 1e3:10.1f} ms ({size / elapsed / 1e6:8.1f} Mchar/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
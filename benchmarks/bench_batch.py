@@ -0,0 +1,47 @@
+# Compare per-message calls with the batch APIs of the affine cipher.
+#
+# Usage: python benchmarks/bench_batch.py
+from timeit import (
+    timeit,
+)
+
+from cryptoy import (
+    affine_cipher,
+    backend,
+)
+
+
+def main() -> None:
+    msgs = [f"message numéro {i}" for i in range(100_000)]
+    msg = "La bombe explosera à l'école 2600 le 01/07/2022"
+    keys = [
+        (a, b)
+        for a in affine_cipher.affine_key_space(0x110000)[:100]
+        for b in range(100)
+    ]
+
+    for name in backend.available_backends():
+        backend.set_backend(name)
+        one_by_one = timeit(
+            lambda: [affine_cipher.encrypt_optimized(m, 13, 1234) for m in msgs],
+            number=1,
+        )
+        many = timeit(lambda: affine_cipher.encrypt_many(msgs, 13, 1234), number=1)
+        print(
+            f"{name:>6} encrypt: {one_by_one / len(msgs) * 1e6:6.2f} us/msg one by one, "
+            f"{many / len(msgs) * 1e6:6.2f} us/msg with encrypt_many"
+        )
+
+        one_by_one = timeit(
+            lambda: [affine_cipher.decrypt_optimized(msg, a, b) for a, b in keys],
+            number=1,
+        )
+        many = timeit(lambda: affine_cipher.decrypt_under_keys(msg, keys), number=1)
+        print(
+            f"{name:>6} decrypt: {one_by_one / len(keys) * 1e6:6.2f} us/key one by one, "
+            f"{many / len(keys) * 1e6:6.2f} us/key with decrypt_under_keys"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# Compare the binary string round trip with the byte-native integer codecs on
+# RSA-sized (256 bytes) blocks.
+#
+# Usage: python benchmarks/bench_codecs.py
+import os
+from timeit import (
+    timeit,
+)
+
+from cryptoy.utils import (
+    binary_strings_to_bytes,
+    bytes_to_binary_strings,
+    bytes_to_int,
+    concat_binary_strings,
+    int_to_binary,
+    int_to_bytes,
+    split_binary_strings,
+)
+
+NUMBER = 10_000
+
+
+def main() -> None:
+    block = os.urandom(256)
+    value = bytes_to_int(block)
+
+    to_int = timeit(
+        lambda: int(concat_binary_strings(bytes_to_binary_strings(block)), 2),
+        number=NUMBER,
+    )
+    from_int = timeit(
+        lambda: binary_strings_to_bytes(split_binary_strings(int_to_binary(value))),
+        number=NUMBER,
+    )
+    print(f"binary strings: {to_int / NUMBER * 1e6:8.2f} us to int, ", end="")
+    print(f"{from_int / NUMBER * 1e6:8.2f} us from int")
+
+    to_int = timeit(lambda: bytes_to_int(block), number=NUMBER)
+    from_int = timeit(lambda: int_to_bytes(value), number=NUMBER)
+    print(f"byte codecs:    {to_int / NUMBER * 1e6:8.2f} us to int, ", end="")
+    print(f"{from_int / NUMBER * 1e6:8.2f} us from int")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Time to get the generator table of a named group when it is built and when
+# it is loaded from the cache directory, as on a new process startup.
+#
+# Usage: python benchmarks/bench_dh_groups.py [group names...]
+import sys
+import tempfile
+import time
+
+from cryptoy import (
+    dh_groups,
+)
+
+
+def table_time(name: str, short_exponent: bool) -> float:
+    # A fresh NamedGroup, like the one of a new process
+    named = dh_groups.get_named_group(name)
+    group = dh_groups.NamedGroup(name, named.prime_number, named.generator)
+    begin = time.perf_counter()
+    group.table(short_exponent)
+    return time.perf_counter() - begin
+
+
+def main() -> None:
+    names = sys.argv[1:] or ["ffdhe2048", "modp4096", "modp8192"]
+    with tempfile.TemporaryDirectory() as tmp:
+        dh_groups.set_cache_dir(tmp)
+        for name in names:
+            for short_exponent in (False, True):
+                built = table_time(name, short_exponent)
+                loaded = table_time(name, short_exponent)
+                print(
+                    f"{name:>10} {'short' if short_exponent else 'full':>5}:"
+                    f" build {built * 1e3:8.1f} ms, load {loaded * 1e3:8.1f} ms"
+                )
+        dh_groups.set_cache_dir(None)
+
+
+if __name__ == "__main__":
+    main()
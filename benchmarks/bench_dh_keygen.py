@@ -0,0 +1,56 @@
+# Diffie-Hellman key generations per second in a 2048-bit group, with a full
+# exponentiation per key, with the fixed-base table of DHGroup, and with short
+# exponents.
+#
+# Usage: python benchmarks/bench_dh_keygen.py [number]
+import sys
+import time
+from timeit import (
+    timeit,
+)
+
+from cryptoy import (
+    dh_groups,
+    diffie_hellman,
+)
+
+# 2048-bit MODP group of RFC 3526
+PRIME_NUMBER = dh_groups.get_named_group("modp2048").prime_number
+GENERATOR = 2
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    group = diffie_hellman.DHGroup(PRIME_NUMBER, GENERATOR)
+    begin = time.perf_counter()
+    group.build()
+    print(f"{'table build':>16}: {(time.perf_counter() - begin) * 1e3:8.1f} ms")
+
+    for name, function in [
+        (
+            "full pow",
+            lambda: diffie_hellman.keygen(PRIME_NUMBER, GENERATOR, cache=False),
+        ),
+        (
+            "DHGroup",
+            lambda: diffie_hellman.keygen(PRIME_NUMBER, GENERATOR, group=group),
+        ),
+        (
+            "short, full pow",
+            lambda: diffie_hellman.keygen(
+                PRIME_NUMBER, GENERATOR, cache=False, short_exponent=True
+            ),
+        ),
+        (
+            "short, DHGroup",
+            lambda: diffie_hellman.keygen(
+                PRIME_NUMBER, GENERATOR, group=group, short_exponent=True
+            ),
+        ),
+    ]:
+        elapsed = timeit(function, number=number) / number
+        print(f"{name:>16}: {1 / elapsed:8.1f} keys/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Throughput of encrypting and decrypting a payload with the RSA block mode and
+# with the RSA + AES-GCM envelope.
+#
+# Usage: python benchmarks/bench_envelope.py [size in KiB]
+import os
+import sys
+import time
+
+from cryptoy import (
+    envelope,
+    rsa_cipher,
+)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    key = rsa_cipher.keygen()
+    data = os.urandom(size << 10)
+
+    for name, encrypt, decrypt in [
+        (
+            "RSA blocks",
+            lambda: rsa_cipher.encrypt_bytes(data, key["public_key"], workers=1),
+            lambda sealed: rsa_cipher.decrypt_bytes(sealed, key, workers=1),
+        ),
+        (
+            "envelope",
+            lambda: envelope.encrypt(data, key["public_key"]),
+            lambda sealed: envelope.decrypt(sealed, key),
+        ),
+    ]:
+        begin = time.perf_counter()
+        sealed = encrypt()
+        middle = time.perf_counter()
+        assert decrypt(sealed) == data
+        end = time.perf_counter()
+        print(
+            f"{name:>10}: encrypt {size / (middle - begin) / 1024:8.3f} MiB/s,"
+            f" decrypt {size / (end - middle) / 1024:8.3f} MiB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
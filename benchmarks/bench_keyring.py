@@ -0,0 +1,68 @@
+# Time to load a set of RSA private keys stored as JSON dicts and stored in a
+# keyring file, and to access a single key of the keyring.
+#
+# Usage: python benchmarks/bench_keyring.py [number of keys]
+import json
+import sys
+import tempfile
+import time
+from pathlib import (
+    Path,
+)
+
+from cryptoy import (
+    rsa_cipher,
+)
+from cryptoy.keyring import (
+    Keyring,
+    load_keys,
+    save_keys,
+)
+
+# Distinct keys generated, repeated up to the requested number of keys
+DISTINCT_KEYS = 8
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    keys = [rsa_cipher.keygen() for _ in range(DISTINCT_KEYS)]
+    keys = [keys[i % DISTINCT_KEYS] for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "keys.json"
+        json_path.write_text(
+            json.dumps(
+                [
+                    {
+                        "public_key": key["public_key"],
+                        "private_key": key["private_key"],
+                        "crt": key["crt"],
+                    }
+                    for key in keys
+                ]
+            )
+        )
+        keyring_path = Path(tmp) / "keys.bin"
+        save_keys(keyring_path, map(rsa_cipher.RSAPrivateKey.from_dict, keys))
+
+        def load_json() -> None:
+            for key in json.loads(json_path.read_text()):
+                rsa_cipher.RSAPrivateKey.from_dict(key)
+
+        def open_keyring() -> None:
+            with Keyring(keyring_path) as keyring:
+                keyring[len(keyring) // 2]
+
+        for name, function in [
+            ("JSON dicts", load_json),
+            ("keyring, all keys", lambda: load_keys(keyring_path)),
+            ("keyring, one key", open_keyring),
+        ]:
+            begin = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - begin
+            print(f"{name:>18}: {elapsed * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
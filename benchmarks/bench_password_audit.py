@@ -0,0 +1,42 @@
+# Hashes per second of a wordlist audit with passwords.attack over
+# iter_wordlist, and with password_audit.audit for 1 worker and for every core.
+#
+# Usage: python benchmarks/bench_password_audit.py [words]
+import os
+import sys
+import tempfile
+import time
+from pathlib import (
+    Path,
+)
+
+from cryptoy import (
+    password_audit,
+    passwords,
+)
+
+
+def main() -> None:
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    # No user is found, so that the whole wordlist is hashed
+    passwords_database = {f"user{i}": "00" * 32 for i in range(1000)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wordlist.txt"
+        path.write_text("".join(f"password{i}\n" for i in range(words)))
+
+        begin = time.perf_counter()
+        passwords.attack(passwords.iter_wordlist(path), passwords_database)
+        elapsed = time.perf_counter() - begin
+        print(f"{'attack':>14}: {words / elapsed:12,.0f} hashes/s")
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            report = password_audit.AuditReport()
+            password_audit.audit(path, passwords_database, workers, report=report)
+            print(
+                f"{f'audit, {workers} cpu':>14}: {report.hashes_per_second:12,.0f} hashes/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Time to audit a database against a wordlist by rehashing it with
+# passwords.attack, and with password_index: the index is built once, then
+# each audit costs one lookup per user.
+#
+# Usage: python benchmarks/bench_password_index.py [words] [users]
+import sys
+import tempfile
+import time
+from pathlib import (
+    Path,
+)
+
+from cryptoy import (
+    password_index,
+    passwords,
+)
+
+
+def main() -> None:
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    # Half of the users are found, the others are not in the wordlist
+    passwords_database = {
+        f"user{i}": passwords.hash_password(f"password{i * words // users}")
+        if i % 2
+        else "00" * 32
+        for i in range(users)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wordlist.txt"
+        path.write_text("".join(f"password{i}\n" for i in range(words)))
+        index = Path(tmp) / "wordlist.pix"
+
+        begin = time.perf_counter()
+        expected = passwords.attack(passwords.iter_wordlist(path), passwords_database)
+        print(f"{'attack':>12}: {time.perf_counter() - begin:10.3f} s")
+
+        begin = time.perf_counter()
+        password_index.build_index(path, index)
+        print(f"{'build index':>12}: {time.perf_counter() - begin:10.3f} s")
+
+        begin = time.perf_counter()
+        with password_index.PasswordIndex(index, path) as password_index_:
+            found = password_index_.attack(passwords_database)
+        print(f"{'index audit':>12}: {time.perf_counter() - begin:10.3f} s")
+        assert found == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Dictionary attack time with the original linear scan of the database and
+# with the hash index of passwords.attack.
+#
+# Usage: python benchmarks/bench_passwords.py [users] [words]
+import random
+import sys
+import time
+
+from cryptoy import (
+    passwords,
+)
+
+
+def original_attack(
+    wordlist: list[str], passwords_database: dict[str, str]
+) -> dict[str, str]:
+    users_and_passwords = {}
+    for password in wordlist:
+        hashed_password = passwords.hash_password(password)
+        if hashed_password in passwords_database.values():
+            user = list(passwords_database.keys())[
+                list(passwords_database.values()).index(hashed_password)
+            ]
+            users_and_passwords[user] = password
+    return users_and_passwords
+
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(2600)  # noqa: S311
+    wordlist = [f"password{i}" for i in range(words)]
+    passwords_database = {
+        f"user{i}": passwords.hash_password(rng.choice(wordlist)) for i in range(users)
+    }
+
+    for name, attack in [
+        ("original", original_attack),
+        ("hash index", passwords.attack),
+    ]:
+        begin = time.perf_counter()
+        found = attack(wordlist, passwords_database)
+        elapsed = time.perf_counter() - begin
+        print(f"{name:>10}: {elapsed * 1e3:9.1f} ms, {len(found)} users found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Compare modular exponentiations with a 2048-bit modulus and exponent.
+#
+# Usage: python benchmarks/bench_pow_mod.py
+import random
+from timeit import (
+    timeit,
+)
+
+from cryptoy.utils import (
+    ModContext,
+    pow_mod,
+)
+
+NUMBER = 20
+
+
+def main() -> None:
+    rng = random.Random(2600)  # noqa: S311
+    m = rng.getrandbits(2048) | (1 << 2047) | 1
+    b, e = rng.randrange(m), rng.getrandbits(2048)
+    context = ModContext(m)
+
+    for name, function in [
+        ("builtin pow", lambda: pow(b, e, m)),
+        ("pow_mod", lambda: pow_mod(b, e, m)),
+        ("ModContext.pow", lambda: context.pow(b, e)),
+        ("ModContext + setup", lambda: ModContext(m).pow(b, e)),
+    ]:
+        elapsed = timeit(function, number=NUMBER) / NUMBER
+        print(f"{name:>20}: {elapsed * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
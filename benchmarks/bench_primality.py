@@ -0,0 +1,61 @@
+# Time to screen a list of random odd candidates with 40 random Miller-Rabin
+# rounds each and with is_prime_many, for 64-bit and 1024-bit candidates.
+#
+# Usage: python benchmarks/bench_primality.py [count]
+import random
+import sys
+import time
+
+from cryptoy import (
+    primality,
+)
+from cryptoy.utils import (
+    miller_rabin,
+)
+
+
+def original_miller_rabin(n: int, k: int) -> bool:
+    # utils.miller_rabin before the deterministic bases
+    if n == 2 or n == 3:
+        return True
+    if n % 2 == 0:
+        return False
+    r, s = 0, n - 1
+    while s % 2 == 0:
+        r += 1
+        s //= 2
+    for _ in range(k):
+        a = random.randrange(2, n - 1)  # noqa: S311
+        x = pow(a, s, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for bits in (64, 1024):
+        candidates = [
+            random.getrandbits(bits) | (1 << (bits - 1)) | 1  # noqa: S311
+            for _ in range(count)
+        ]
+        for name, screen in [
+            ("original", lambda: [original_miller_rabin(n, 40) for n in candidates]),
+            ("miller_rabin", lambda: [miller_rabin(n, 40) for n in candidates]),
+            ("is_prime_many", lambda: primality.is_prime_many(candidates)),
+        ]:
+            primality.probable_prime.cache_clear()
+            begin = time.perf_counter()
+            screen()
+            elapsed = time.perf_counter() - begin
+            print(f"{bits:>4} bits {name:>14}: {elapsed / count * 1e6:8.1f} µs/number")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Median latency of drawing the two 1024-bit primes of an RSA key, with the
+# original draw loop and with draw_random_prime.
+#
+# Usage: python benchmarks/bench_primes.py [runs]
+import random
+import statistics
+import sys
+import time
+from collections.abc import (
+    Callable,
+)
+
+from cryptoy.utils import (
+    draw_random_prime,
+    miller_rabin,
+)
+
+
+def original_draw_random_prime(min: int = 2**1023, max: int = 2**1024) -> int:
+    while True:
+        p = (2 * random.randint(min, max) + 1) % max  # noqa: S311
+        if pow(2, p - 1, p) != 1:
+            continue
+        if miller_rabin(p, 40):
+            return p
+
+
+def median_keygen_latency(draw: Callable[[], int], runs: int) -> float:
+    latencies = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        draw()
+        draw()
+        latencies.append(time.perf_counter() - begin)
+    return statistics.median(latencies)
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name, draw in [
+        ("original", original_draw_random_prime),
+        ("draw_random_prime", draw_random_prime),
+    ]:
+        print(f"{name:>18}: {median_keygen_latency(draw, runs) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Decryptions per second of a 2048-bit RSA key, with the full exponentiation
+# modulo n and with the CRT form kept by keygen.
+#
+# Usage: python benchmarks/bench_rsa_crt.py [number]
+import sys
+from timeit import (
+    timeit,
+)
+
+from cryptoy import (
+    rsa_cipher,
+)
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    key = rsa_cipher.keygen()
+    legacy_key = {"public_key": key["public_key"], "private_key": key["private_key"]}
+    cipher_text = rsa_cipher.encrypt("Hello World", key["public_key"])
+
+    for name, function in [
+        ("full pow", lambda: rsa_cipher.decrypt(cipher_text, legacy_key)),
+        ("CRT", lambda: rsa_cipher.decrypt(cipher_text, key)),
+    ]:
+        elapsed = timeit(function, number=number) / number
+        print(f"{name:>10}: {1 / elapsed:8.1f} decryptions/s")
+
+
+if __name__ == "__main__":
+    main()
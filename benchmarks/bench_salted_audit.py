@@ -0,0 +1,47 @@
+# Hashes per second of a salted audit: hash_password(salt + word) for every
+# word, and audit_salted, which copies a hasher state holding the salt.
+#
+# Usage: python benchmarks/bench_salted_audit.py [users] [words]
+import sys
+import tempfile
+import time
+from pathlib import (
+    Path,
+)
+
+from cryptoy import (
+    password_audit,
+    passwords,
+)
+
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    # No password is found, so that every user goes through the whole list
+    new_database = {
+        f"user{i}": {
+            "password_hash": "00" * 32,
+            "password_salt": passwords.random_salt(),
+        }
+        for i in range(users)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wordlist.txt"
+        path.write_text("".join(f"password{i}\n" for i in range(words)))
+
+        begin = time.perf_counter()
+        for entry in new_database.values():
+            for word in passwords.iter_wordlist(path):
+                passwords.hash_password(entry["password_salt"] + word)
+        elapsed = time.perf_counter() - begin
+        print(f"{'hash_password':>14}: {users * words / elapsed:12,.0f} hashes/s")
+
+        report = password_audit.AuditReport()
+        password_audit.audit_salted(path, new_database, 1, report=report)
+        print(f"{'audit_salted':>14}: {report.hashes_per_second:12,.0f} hashes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,25 @@
+from typing import (
+    Optional,
+)
+
 from cryptography.hazmat.primitives.ciphers.aead import (
     AESGCM,
 )
 
 
-def encrypt(msg: bytes, key: bytes, nonce: bytes) -> bytes:
+def encrypt(
+    msg: bytes, key: bytes, nonce: bytes, associated_data: Optional[bytes] = None
+) -> bytes:
     # A implémenter en utilisant la class AESGCM
     cipher = AESGCM(key)
 
-    return cipher.encrypt(nonce, msg, None)
+    return cipher.encrypt(nonce, msg, associated_data)
 
 
-def decrypt(msg: bytes, key: bytes, nonce: bytes) -> bytes:
+def decrypt(
+    msg: bytes, key: bytes, nonce: bytes, associated_data: Optional[bytes] = None
+) -> bytes:
     # A implémenter en utilisant la class AESGCM
     cipher = AESGCM(key)
 
-    return cipher.decrypt(nonce, msg, None)
+    return cipher.decrypt(nonce, msg, associated_data)
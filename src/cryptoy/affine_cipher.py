@@ -1,23 +1,168 @@
+from array import (
+    array,
+)
+from collections.abc import (
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from functools import (
+    lru_cache,
+)
+from itertools import (
+    combinations,
+)
 from math import (
     gcd,
+    prod,
+)
+from typing import (
+    IO,
+    Any,
+    Optional,
+    Union,
+    overload,
 )
 
+from cryptoy.backend import (
+    affine_map,
+    affine_map_many,
+    affine_map_under_keys,
+)
+from cryptoy.permutation_cache import (
+    ITEMSIZE,
+    TYPECODE,
+    PermutationCache,
+)
 from cryptoy.utils import (
+    STREAM_CHUNK_SIZE,
+    batch_modular_inverse,
+    euler_totient,
+    modular_inverse,
+    prime_factors,
+    read_text_chunks,
+    solve_linear_congruence,
     str_to_unicodes,
     unicodes_to_str,
+    write_text_chunks,
 )
 
 # TP: Chiffrement affine
 
+# Above this radical, the units are not tabulated over one period and indexing
+# falls back to a binary search
+MAX_TABULATED_RADICAL = 1 << 16
+
+
+class AffineKeySpace(Sequence[int]):
+    # The affine keys modulo n, ie the integers a in [1, n) with gcd(a, n) == 1,
+    # in increasing order. Nothing is materialized: membership only checks the
+    # prime factors of n, and since the keys are periodic modulo the radical of
+    # n (the product of its prime factors), indexing only needs the keys of one
+    # period.
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.primes = sorted(prime_factors(n)) if n > 1 else []
+        self.radical = prod(self.primes)
+        self._length = euler_totient(n) if n > 1 else 0
+        self._residues: Optional[list[int]] = None
+        if n > 1 and self.radical <= MAX_TABULATED_RADICAL:
+            self._residues = [
+                r for r in range(1, self.radical + 1) if gcd(r, self.radical) == 1
+            ]
+
+    def __repr__(self) -> str:
+        return f"AffineKeySpace({self.n})"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, a: object) -> bool:
+        return (
+            isinstance(a, int)
+            and 0 < a < self.n
+            and all(a % p != 0 for p in self.primes)
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        if self._residues is None:
+            for a in range(1, self.n):
+                if a in self:
+                    yield a
+            return
+        for base in range(0, self.n, self.radical):
+            for r in self._residues:
+                yield base + r
+
+    @overload
+    def __getitem__(self, index: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[int]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, list[int]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("affine key index out of range")
+        if self._residues is not None:
+            period, i = divmod(index, len(self._residues))
+            return period * self.radical + self._residues[i]
+
+        # Smallest a such that there are index + 1 keys in [1, a]
+        low, high = 1, self.n - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._count_up_to(middle) > index:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _count_up_to(self, x: int) -> int:
+        # Number of keys in [1, x], by inclusion-exclusion over the prime factors
+        count = 0
+        for size in range(len(self.primes) + 1):
+            for subset in combinations(self.primes, size):
+                count += (-1) ** size * (x // prod(subset))
+        return count
+
+
+@lru_cache(maxsize=32)
+def affine_key_space(n: int) -> AffineKeySpace:
+    return AffineKeySpace(n)
+
+
+# Permutation tables used by encrypt and decrypt, see PermutationCache.configure
+# to change its limits or to spill tables to memory-mapped files
+permutation_cache = PermutationCache()
+
+
+def permutation_table(a: int, b: int, n: int) -> memoryview:
+    if a not in affine_key_space(n):
+        raise RuntimeError(f"{a} not a valid key")
+
+    return permutation_cache.get(a, b, n)
+
+
+def inverse_permutation_table(a: int, b: int, n: int) -> memoryview:
+    # The inverse of x -> a * x + b is itself affine: y -> a_1 * y - a_1 * b
+    if a not in affine_key_space(n):
+        raise RuntimeError(f"{a} not a valid key")
+
+    a_1 = affine_key_inverse(a, n)
+    return permutation_cache.get(a_1, -a_1 * b, n)
+
 
 def compute_permutation(a: int, b: int, n: int) -> list[int]:
     # A implémenter, en sortie on doit avoir une liste result tel que result[i] == (a * i + b) % n
     # en affine on a n max permutations possibles
-    keys = compute_affine_keys(n)
-    if a not in keys:
-        raise RuntimeError(f"{a} not a valid key")
-
-    return [(a * i +b) %n for i in range(n)]
+    return list(permutation_table(a, b, n))
 
 
 def compute_inverse_permutation(a: int, b: int, n: int) -> list[int]:
@@ -25,30 +170,25 @@ def compute_inverse_permutation(a: int, b: int, n: int) -> list[int]:
     # result qui est telle que: perm[i] == j implique result[j] == i
     # ca veut dire que si perm[0] == 3, alors inverse_perm[3] = 0
 
-    perm = compute_permutation(a, b, n)
-    inverse_perm = [0]*n
-    for i in range(n):
-        inverse_perm[perm[i]] = i
-
-    return inverse_perm
+    return list(inverse_permutation_table(a, b, n))
 
 
 def encrypt(msg: str, a: int, b: int) -> str:
     # A implémenter, en utilisant compute_permutation, str_to_unicodes et unicodes_to_str
 
-    perm = compute_permutation(a, b, 0x110000)
+    perm = permutation_table(a, b, 0x110000)
 
     return unicodes_to_str([perm[i] for i in str_to_unicodes(msg)])
 
 
 def encrypt_optimized(msg: str, a: int, b: int) -> str:
     # A implémenter, sans utiliser compute_permutation
-    return unicodes_to_str([(a*i+b)%0x110000 for i in str_to_unicodes(msg)])
+    return affine_map(msg, a, b)
 
 
 def decrypt(msg: str, a: int, b: int) -> str:
     # A implémenter, en utilisant compute_inverse_permutation, str_to_unicodes et unicodes_to_str
-    inverse_perm = compute_inverse_permutation(a, b, 0x110000)
+    inverse_perm = inverse_permutation_table(a, b, 0x110000)
     return unicodes_to_str([inverse_perm[i] for i in str_to_unicodes(msg)])
 
 
@@ -56,28 +196,87 @@ def decrypt_optimized(msg: str, a_inverse: int, b: int) -> str:
     # A implémenter, sans utiliser compute_inverse_permutation
     # On suppose que a_inverse a été précalculé en utilisant compute_affine_key_inverse, et passé
     # a la fonction
-    return unicodes_to_str([((i-b)*a_inverse)%0x110000 for i in str_to_unicodes(msg)])
+    # (x - b) * a_inverse == a_inverse * x - a_inverse * b
+    return affine_map(msg, a_inverse, -a_inverse * b)
+
+
+def encrypt_many(msgs: Sequence[str], a: int, b: int) -> list[str]:
+    # Same as [encrypt_optimized(msg, a, b) for msg in msgs], in a single pass
+    return affine_map_many(msgs, a, b)
+
+
+def decrypt_many(msgs: Sequence[str], a_inverse: int, b: int) -> list[str]:
+    return affine_map_many(msgs, a_inverse, -a_inverse * b)
+
+
+def decrypt_under_keys(msg: str, keys: Sequence[tuple[int, int]]) -> list[str]:
+    # Same as [decrypt_optimized(msg, a_inverse, b) for a_inverse, b in keys]
+    return affine_map_under_keys(
+        msg, [(a_inverse, -a_inverse * b) for a_inverse, b in keys]
+    )
+
+
+def encrypt_chunks(chunks: Iterable[str], a: int, b: int) -> Iterator[str]:
+    for chunk in chunks:
+        yield encrypt_optimized(chunk, a, b)
+
+
+def decrypt_chunks(chunks: Iterable[str], a_inverse: int, b: int) -> Iterator[str]:
+    for chunk in chunks:
+        yield decrypt_optimized(chunk, a_inverse, b)
+
+
+def encrypt_stream(
+    src: IO[Any], dst: IO[Any], a: int, b: int, chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+    # Encrypts src into dst chunk by chunk, returns the number of characters
+    return write_text_chunks(
+        dst, encrypt_chunks(read_text_chunks(src, chunk_size), a, b)
+    )
+
+
+def decrypt_stream(
+    src: IO[Any],
+    dst: IO[Any],
+    a_inverse: int,
+    b: int,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> int:
+    return write_text_chunks(
+        dst, decrypt_chunks(read_text_chunks(src, chunk_size), a_inverse, b)
+    )
 
 
 def compute_affine_keys(n: int) -> list[int]:
     # A implémenter, doit calculer l'ensemble des nombre a entre 1 et n tel que gcd(a, n) == 1
     # c'est à dire les nombres premiers avec n
-    return [i for i in range(1, n) if gcd(i,n)==1]
+    return list(affine_key_space(n))
 
 
-def compute_affine_key_inverse(a: int, affine_keys: list, n: int) -> int:
+def compute_affine_key_inverse(a: int, affine_keys: Sequence[int], n: int) -> int:
     # Trouver a_1 dans affine_keys tel que a * a_1 % N == 1 et le renvoyer
     # Placer le code ici (une boucle)
-    
+
     # a est invertible modulo n si pgcd(a,n) = 1
-    for key in affine_keys:
-        if (a * key)%n == 1:
-            return key
+    # affine_keys is kept for compatibility: the inverse is computed directly
+    # with the extended Euclidean algorithm instead of scanning the keys
+    return affine_key_inverse(a, n)
+
+
+def affine_key_inverse(a: int, n: int) -> int:
+    try:
+        return modular_inverse(a % n, n)
+    except RuntimeError:
+        raise RuntimeError(f"{a} has no modular inverse") from None
 
-    raise RuntimeError(f"{a} has no modular inverse")
-    
-    # Si a_1 n'existe pas, alors a n'a pas d'inverse, on lance une erreur:
-    
+
+def inverse_table(n: int) -> array:
+    # table[a] is the inverse of a modulo n for every affine key a, 0 elsewhere
+    keys = list(affine_key_space(n))
+    table = array(TYPECODE, bytes(n * ITEMSIZE))
+    for a, a_1 in zip(keys, batch_modular_inverse(keys, n)):
+        table[a] = a_1
+    return table
 
 
 def attack() -> tuple[str, tuple[int, int]]:
@@ -86,25 +285,7 @@ def attack() -> tuple[str, tuple[int, int]]:
     # avec comme info: "bombe" in msg et b == 58
 
     # Placer le code ici
-    b = 58
-    keys = compute_affine_keys(0x110000)
-
-    for key in range(1, 100):
-        
-
-        try:
-            decrypted = decrypt(s, keys[key], b)
-            if "bombe" in decrypted:
-                print(f"key recovered : {key}")
-                print(f"message recovered : {decrypted}")
-                return (decrypted, (keys[key],b))
-        except:
-            pass
-        
-
-
-
-    raise RuntimeError("Failed to attack")
+    return attack_known_plaintext(s, "bombe", b=58)
 
 
 def attack_optimized() -> tuple[str, tuple[int, int]]:
@@ -113,18 +294,53 @@ def attack_optimized() -> tuple[str, tuple[int, int]]:
         "\u0c64\u0c64ൈᘝࠖܲೖఅܲఘഏ೩ఘ\u0c51ܲ\u0c51൛൮ܲఅ\u0cfc\u0cfcඁೖᘝ\u0c51"
     )
 
-    keys = compute_affine_keys(0x110000)
-
-    for a in keys:
-        a_inverse = compute_affine_key_inverse(a, keys, 0x110000)
-        for b in range(1, 10000):
-            decrypted = decrypt_optimized(s, a_inverse, b)
-            if "bombe" in decrypted:
-                return (decrypted, (a,b))
-        
     # trouver msg, a et b tel que affine_cipher_encrypt(msg, a, b) == s
     # avec comme info: "bombe" in msg
 
     # Placer le code ici
+    return attack_known_plaintext(s, "bombe")
+
+
+def find_crib_keys(
+    msg: str, crib: str, n: int = 0x110000, b: Optional[int] = None
+) -> list[tuple[int, int]]:
+    # Aligning the crib on position i of the ciphertext gives, for every j,
+    # msg[i + j] == a * crib[j] + b mod n. Subtracting the equation for j == 0
+    # leaves a linear congruence in a alone:
+    #     (crib[j] - crib[0]) * a == msg[i + j] - msg[i] mod n
+    # j is picked so that the congruence has as few solutions as possible, then
+    # b follows from the equation for j == 0.
+    codes = str_to_unicodes(msg)
+    crib_codes = str_to_unicodes(crib)
+    if len(set(crib_codes)) < 2:
+        raise ValueError("crib needs at least two distinct characters")
+    deltas = [(code - crib_codes[0]) % n for code in crib_codes]
+    j = min(range(1, len(deltas)), key=lambda k: gcd(deltas[k], n))
+
+    key_space = affine_key_space(n)
+    keys = []
+    for i in range(len(codes) - len(crib_codes) + 1):
+        window = codes[i : i + len(crib_codes)]
+        for a in solve_linear_congruence(deltas[j], window[j] - window[0], n):
+            if a not in key_space:
+                continue
+            key = (a, (window[0] - a * crib_codes[0]) % n)
+            if b is not None and key[1] != b % n:
+                continue
+            # Only the crib window is checked before accepting the key
+            if key not in keys and all(
+                (a * p + key[1]) % n == c for p, c in zip(crib_codes, window)
+            ):
+                keys.append(key)
+    return keys
+
+
+def attack_known_plaintext(
+    msg: str, crib: str, b: Optional[int] = None
+) -> tuple[str, tuple[int, int]]:
+    for a, key_b in find_crib_keys(msg, crib, b=b):
+        decrypted = decrypt_optimized(msg, affine_key_inverse(a, 0x110000), key_b)
+        if crib in decrypted:
+            return decrypted, (a, key_b)
 
     raise RuntimeError("Failed to attack")
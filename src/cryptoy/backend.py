@@ -0,0 +1,129 @@
+import os
+from collections.abc import (
+    Sequence,
+)
+from itertools import (
+    accumulate,
+)
+from typing import (
+    Optional,
+)
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore[assignment]
+
+# Codepoint engines used by the Caesar and affine ciphers:
+# - "python": the map is computed once per distinct character and applied with
+#   str.translate
+# - "numpy": the text is viewed as a uint32 array through UTF-32 and
+#   transformed with whole-array operations (requires numpy to be installed)
+# - "auto": numpy for messages of at least NUMPY_MIN_LENGTH characters when it
+#   is installed, python otherwise
+# The default can be set with the CRYPTOY_BACKEND environment variable.
+BACKENDS = ("auto", "python", "numpy")
+
+# Below this size, the numpy round trip costs more than the Python loop
+NUMPY_MIN_LENGTH = 256
+
+# Maximum number of codepoints transformed at once by affine_map_under_keys
+NUMPY_MAX_BLOCK = 1 << 22
+
+UNICODE_SIZE = 0x110000
+
+_backend = os.environ.get("CRYPTOY_BACKEND", "auto")
+
+
+def available_backends() -> list[str]:
+    return [name for name in BACKENDS if name != "numpy" or numpy is not None]
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r}, expected one of {BACKENDS}")
+    if name not in available_backends():
+        raise RuntimeError(f"backend {name!r} requires numpy")
+    _backend = name
+
+
+def resolve_backend(msg_length: int, backend: Optional[str] = None) -> str:
+    name = backend or _backend
+    if name == "auto":
+        if numpy is not None and msg_length >= NUMPY_MIN_LENGTH:
+            return "numpy"
+        return "python"
+    if name not in available_backends():
+        raise RuntimeError(f"backend {name!r} is not available")
+    return name
+
+
+def affine_map(msg: str, a: int, b: int, backend: Optional[str] = None) -> str:
+    # Replace every codepoint x of msg with (a * x + b) % 0x110000
+    a %= UNICODE_SIZE
+    b %= UNICODE_SIZE
+    if resolve_backend(len(msg), backend) == "numpy":
+        return _numpy_affine_map(msg, a, b)
+    return _python_affine_map(msg, a, b)
+
+
+def _python_affine_map(msg: str, a: int, b: int) -> str:
+    # The map is only computed once per distinct character, str.translate then
+    # applies it to the whole message
+    table = {ord(c): (a * ord(c) + b) % UNICODE_SIZE for c in set(msg)}
+    return msg.translate(table)
+
+
+def _numpy_affine_map(msg: str, a: int, b: int) -> str:
+    # surrogatepass keeps lone surrogates, which the ciphers can produce
+    codes = numpy.frombuffer(msg.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    # a * x + b < 2**42, so uint64 arithmetic cannot overflow
+    result = codes.astype(numpy.uint64)
+    result *= a
+    result += b
+    result %= UNICODE_SIZE
+    return result.astype("<u4").tobytes().decode("utf-32-le", "surrogatepass")
+
+
+def affine_map_many(
+    msgs: Sequence[str], a: int, b: int, backend: Optional[str] = None
+) -> list[str]:
+    # Same as [affine_map(msg, a, b) for msg in msgs], with the messages
+    # concatenated so that the whole batch is transformed at once
+    encrypted = affine_map("".join(msgs), a, b, backend)
+    ends = list(accumulate(len(msg) for msg in msgs))
+    return [encrypted[end - len(msg) : end] for msg, end in zip(msgs, ends)]
+
+
+def affine_map_under_keys(
+    msg: str, keys: Sequence[tuple[int, int]], backend: Optional[str] = None
+) -> list[str]:
+    # Same as [affine_map(msg, a, b) for a, b in keys]
+    if resolve_backend(len(msg) * len(keys), backend) != "numpy" or not msg:
+        return [
+            _python_affine_map(msg, a % UNICODE_SIZE, b % UNICODE_SIZE) for a, b in keys
+        ]
+
+    codes = numpy.frombuffer(msg.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    codes = codes.astype(numpy.uint64)
+    results: list[str] = []
+    # Blocks of keys, so that the 2-D result stays under NUMPY_MAX_BLOCK items
+    block = max(1, NUMPY_MAX_BLOCK // len(msg))
+    for start in range(0, len(keys), block):
+        pairs = numpy.array(
+            [
+                (a % UNICODE_SIZE, b % UNICODE_SIZE)
+                for a, b in keys[start : start + block]
+            ],
+            dtype=numpy.uint64,
+        )
+        # One row per key
+        rows = (pairs[:, :1] * codes + pairs[:, 1:]) % UNICODE_SIZE
+        text = rows.astype("<u4").tobytes().decode("utf-32-le", "surrogatepass")
+        results.extend(text[i : i + len(msg)] for i in range(0, len(text), len(msg)))
+    return results
@@ -1,6 +1,27 @@
+from collections import (
+    Counter,
+)
+from collections.abc import (
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from typing import (
+    IO,
+    Any,
+)
+
+from cryptoy.backend import (
+    affine_map,
+    affine_map_many,
+    affine_map_under_keys,
+)
 from cryptoy.utils import (
+    CHARACTER_FREQUENCIES,
+    STREAM_CHUNK_SIZE,
+    read_text_chunks,
     str_to_unicodes,
-    unicodes_to_str,
+    write_text_chunks,
 )
 
 # TP: Chiffrement de César
@@ -11,13 +32,54 @@ def encrypt(msg: str, shift: int) -> str:
     # Il faut utiliser la fonction str_to_unicodes, puis appliquer la formule
     # (x + shift) % 0x110000 pour chaque unicode du tableau puis utiliser
     # unicodes_to_str pour repasser en string
-    return unicodes_to_str([(x + shift) % 0x110000 for x in str_to_unicodes(msg)])
+    return affine_map(msg, 1, shift)
 
 
 def decrypt(msg: str, shift: int) -> str:
     # Implémenter le déchiffrement. Astuce: on peut implémenter le déchiffrement en
     # appelant la fonction de chiffrement en modifiant légèrement le paramètre
-    return unicodes_to_str([(x - shift) % 0x110000 for x in str_to_unicodes(msg)])
+    return affine_map(msg, 1, -shift)
+
+
+def encrypt_many(msgs: Sequence[str], shift: int) -> list[str]:
+    # Same as [encrypt(msg, shift) for msg in msgs], in a single pass
+    return affine_map_many(msgs, 1, shift)
+
+
+def decrypt_many(msgs: Sequence[str], shift: int) -> list[str]:
+    return affine_map_many(msgs, 1, -shift)
+
+
+def decrypt_under_keys(msg: str, shifts: Sequence[int]) -> list[str]:
+    # Same as [decrypt(msg, shift) for shift in shifts]
+    return affine_map_under_keys(msg, [(1, -shift) for shift in shifts])
+
+
+def encrypt_chunks(chunks: Iterable[str], shift: int) -> Iterator[str]:
+    for chunk in chunks:
+        yield encrypt(chunk, shift)
+
+
+def decrypt_chunks(chunks: Iterable[str], shift: int) -> Iterator[str]:
+    for chunk in chunks:
+        yield decrypt(chunk, shift)
+
+
+def encrypt_stream(
+    src: IO[Any], dst: IO[Any], shift: int, chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+    # Encrypts src into dst chunk by chunk, returns the number of characters
+    return write_text_chunks(
+        dst, encrypt_chunks(read_text_chunks(src, chunk_size), shift)
+    )
+
+
+def decrypt_stream(
+    src: IO[Any], dst: IO[Any], shift: int, chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+    return write_text_chunks(
+        dst, decrypt_chunks(read_text_chunks(src, chunk_size), shift)
+    )
 
 
 def attack() -> tuple[str, int]:
@@ -29,9 +91,64 @@ def attack() -> tuple[str, int]:
     # ou msg est le message déchiffré, et shift la clef de chiffrage correspondant
 
     # Si on ne trouve pas on lance une exception:
+    return attack_known_plaintext(s, "ennemis")
+
+
+def find_crib_shifts(msg: str, crib: str) -> list[int]:
+    # Aligning the crib on position i of the ciphertext fixes the shift to
+    # (msg[i] - crib[0]) % 0x110000, keep the alignments where the rest of the
+    # crib agrees with that shift
+    codes = str_to_unicodes(msg)
+    crib_codes = str_to_unicodes(crib)
+    if not crib_codes:
+        raise ValueError("crib must not be empty")
+
+    shifts = []
+    for i in range(len(codes) - len(crib_codes) + 1):
+        shift = (codes[i] - crib_codes[0]) % 0x110000
+        if shift in shifts:
+            continue
+        if all(
+            (codes[i + j] - code) % 0x110000 == shift
+            for j, code in enumerate(crib_codes)
+        ):
+            shifts.append(shift)
+    return shifts
+
+
+def attack_known_plaintext(msg: str, crib: str) -> tuple[str, int]:
+    for shift in find_crib_shifts(msg, crib):
+        decrypted = decrypt(msg, shift)
+        if crib in decrypted:
+            return decrypted, shift
+
+    raise RuntimeError("Failed to attack")
+
+
+def score_shift(histogram: Counter, shift: int) -> float:
+    # Score of the decryption under shift, computed from the ciphertext
+    # histogram so the text itself is never decrypted
+    return sum(
+        count * CHARACTER_FREQUENCIES.get(chr((code - shift) % 0x110000).lower(), 0.0)
+        for code, count in histogram.items()
+    )
+
 
-    for shift in range(0x110000):
-        msg = decrypt(s, shift)
-        if "ennemis" in msg:
-            return msg, shift
+def attack_ciphertext_only(msg: str, candidates: int = 4) -> tuple[str, int]:
+    # The most frequent ciphertext characters most likely decrypt to the most
+    # frequent plaintext characters: each pair gives a candidate shift, and the
+    # best candidate according to score_shift wins
+    histogram = Counter(str_to_unicodes(msg))
+    if not histogram:
+        raise RuntimeError("Failed to attack")
 
+    common_plain = sorted(
+        CHARACTER_FREQUENCIES, key=CHARACTER_FREQUENCIES.__getitem__, reverse=True
+    )[:candidates]
+    shifts = {
+        (code - ord(char)) % 0x110000
+        for code, _count in histogram.most_common(candidates)
+        for char in common_plain
+    }
+    shift = max(sorted(shifts), key=lambda s: score_shift(histogram, s))
+    return decrypt(msg, shift), shift
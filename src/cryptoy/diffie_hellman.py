@@ -1,22 +1,204 @@
+import os
 import random
-import sys
+from collections.abc import (
+    Iterable,
+)
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+from functools import (
+    lru_cache,
+)
+from threading import (
+    Lock,
+)
+from typing import (
+    Any,
+    Optional,
+)
 
 from cryptoy.utils import (
     pow_mod,
 )
 
-sys.setrecursionlimit(5000)  # Required for pow_mod for large exponents
+# Bits of exponent handled per row of the fixed-base table. The table holds
+# (2 ** DH_WINDOW - 1) * bits / DH_WINDOW numbers modulo p: about 5 MiB for
+# a 2048-bit group with 6-bit windows.
+DH_WINDOW = 6
+
+# Number of groups kept by get_group
+GROUP_CACHE_SIZE = 16
+
+# Security level in bits of a group with a prime of at least this many bits
+# (NIST SP 800-57 Part 1, table 2)
+SECURITY_LEVELS = ((15360, 256), (7680, 192), (3072, 128), (2048, 112), (1024, 80))
+
+# Keys per task sent to the process pool by keygen_many and
+# compute_shared_secret_keys
+BATCH_CHUNK_SIZE = 64
+
+# Keys from which keygen_many uses the fixed-base table of get_group: building
+# the table costs about as much as 16 exponentiations with pow, whatever the
+# size of the group
+BATCH_GROUP_MIN_KEYS = 16
+
+
+class DHGroup:
+    # Prime and generator of a Diffie-Hellman group, with a fixed-base table of
+    # powers of the generator: row i holds generator ** (d << (window * i)) for
+    # every window digit d, so generator ** x only needs one multiplication per
+    # non-zero digit of x instead of a full exponentiation.
+    #
+    # With lazy, the table is built by the first call to power. The table
+    # covers exponents of up to exponent_bits bits (the size of the prime by
+    # default), longer ones fall back to pow.
+
+    def __init__(
+        self,
+        prime_number: int,
+        generator: int,
+        window: int = DH_WINDOW,
+        lazy: bool = True,
+        exponent_bits: Optional[int] = None,
+    ) -> None:
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.prime_number = prime_number
+        self.generator = generator
+        self.window = window
+        self.exponent_bits = exponent_bits or prime_number.bit_length()
+        self._rows: Optional[list[list[int]]] = None
+        self._lock = Lock()
+        if not lazy:
+            self.build()
+
+    def __repr__(self) -> str:
+        return f"DHGroup({self.prime_number:#x}, {self.generator})"
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The lock cannot be pickled, the table is sent along when built
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._rows is not None
+
+    @property
+    def row_count(self) -> int:
+        return -(-self.exponent_bits // self.window)
+
+    def load_rows(self, rows: list[list[int]]) -> None:
+        # Installs a table built earlier, for instance saved to a file
+        if len(rows) != self.row_count or any(
+            len(row) != 1 << self.window for row in rows
+        ):
+            raise ValueError("table does not match the group window")
+        with self._lock:
+            self._rows = rows
+
+    def build(self) -> list[list[int]]:
+        rows = self._rows
+        if rows is not None:
+            return rows
+        with self._lock:
+            if self._rows is None:
+                p = self.prime_number
+                rows = []
+                base = self.generator % p
+                for _ in range(0, self.exponent_bits, self.window):
+                    row = [1] * (1 << self.window)
+                    x = 1
+                    for digit in range(1, len(row)):
+                        x = x * base % p
+                        row[digit] = x
+                    rows.append(row)
+                    # base ** (2 ** window) for the next row
+                    base = x * base % p
+                self._rows = rows
+            return self._rows
+
+    def power(self, exponent: int) -> int:
+        # generator ** exponent % prime_number
+        if exponent < 0 or exponent.bit_length() > self.exponent_bits:
+            return pow(self.generator, exponent, self.prime_number)
+        p = self.prime_number
+        mask = (1 << self.window) - 1
+        result = 1
+        for row in self.build():
+            # Short exponents only use the first rows
+            if not exponent:
+                break
+            digit = exponent & mask
+            if digit:
+                result = result * row[digit] % p
+            exponent >>= self.window
+        return result % p
+
 
+@lru_cache(maxsize=GROUP_CACHE_SIZE)
+def get_group(prime_number: int, generator: int) -> DHGroup:
+    return DHGroup(prime_number, generator)
 
-def keygen(prime_number: int, generator: int) -> dict[str, int]:
+
+def security_level(prime_number: int) -> int:
+    # 0 for primes too small to be listed
+    bits = prime_number.bit_length()
+    for min_bits, level in SECURITY_LEVELS:
+        if bits >= min_bits:
+            return level
+    return 0
+
+
+def short_exponent_bits(prime_number: int) -> int:
+    # Private keys of twice the security level resist the discrete logarithm
+    # algorithms that depend on the size of the exponent (Pollard's kangaroo).
+    # Unlisted groups keep full size exponents.
+    bits = prime_number.bit_length() - 1
+    level = security_level(prime_number)
+    return min(2 * level, bits) if level else bits
+
+
+def draw_private_key(prime_number: int, short_exponent: bool = False) -> int:
+    if short_exponent:
+        return random.randint(2, (1 << short_exponent_bits(prime_number)) - 1)
+    return random.randint(2, prime_number - 1)
+
+
+def keygen(
+    prime_number: int,
+    generator: int,
+    group: Optional[DHGroup] = None,
+    cache: bool = False,
+    short_exponent: bool = False,
+) -> dict[str, int]:
     # Implementez la generation de clef de diffie hellman
     # 1. Tire aléatoirement un nombre secret private_key entre 2 et prime_number - 1 inclus avec random.randint(min, max)
     # 2. Calcule la clef publique public_key = generator ** private_key % prime_number; utiliser la fonction pow_mod
     # 3. Renvoit le dictionnaitre {"public_key": A, "private_key": a}
     
-    private_key = random.randint(2, prime_number -1)
+    # With short_exponent, private_key has short_exponent_bits(prime_number) bits
+    private_key = draw_private_key(prime_number, short_exponent)
 
-    public_key = pow(generator, private_key, prime_number)
+    # The fixed-base table of the group is shared by every key of the group.
+    # It only pays off after a few keys, so get_group is only used with cache.
+    # Without group nor cache, the exponentiation is done from scratch.
+    if group is not None and (group.prime_number, group.generator) != (
+        prime_number,
+        generator,
+    ):
+        raise ValueError("group does not match prime_number and generator")
+    if group is None and cache:
+        group = get_group(prime_number, generator)
+    if group is not None:
+        public_key = group.power(private_key)
+    else:
+        public_key = pow(generator, private_key, prime_number)
    
     return {"public_key": public_key, "private_key": private_key}
 
@@ -27,3 +209,102 @@ def compute_shared_secret_key(public: int, private: int, prime_number: int) -> i
 
 
     return pow(public, private, prime_number)
+
+
+# Groups received by the worker processes of keygen_many
+_worker_groups: dict[tuple[int, int], DHGroup] = {}
+
+
+def _init_batch_worker(group: DHGroup) -> None:
+    # Workers reuse the table built by the parent instead of building their own
+    _worker_groups[group.prime_number, group.generator] = group
+
+
+def _keygen_chunk(
+    prime_number: int, generator: int, count: int, short_exponent: bool
+) -> list[dict[str, int]]:
+    group = _worker_groups.get((prime_number, generator))
+    return [
+        keygen(prime_number, generator, group=group, short_exponent=short_exponent)
+        for _ in range(count)
+    ]
+
+
+def _shared_secret_chunk(
+    publics: list[int], private: int, prime_number: int
+) -> list[int]:
+    return [
+        compute_shared_secret_key(public, private, prime_number) for public in publics
+    ]
+
+
+def keygen_many(
+    prime_number: int,
+    generator: int,
+    count: int,
+    short_exponent: bool = False,
+    workers: Optional[int] = None,
+) -> list[dict[str, int]]:
+    # count keys of the group, generated on a process pool (inline with
+    # workers == 1)
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        min(BATCH_CHUNK_SIZE, count - start)
+        for start in range(0, count, BATCH_CHUNK_SIZE)
+    ]
+    if workers == 1 or len(chunks) <= 1:
+        inline_group = (
+            get_group(prime_number, generator)
+            if count >= BATCH_GROUP_MIN_KEYS
+            else None
+        )
+        return [
+            keygen(
+                prime_number,
+                generator,
+                group=inline_group,
+                short_exponent=short_exponent,
+            )
+            for _ in range(count)
+        ]
+
+    group = get_group(prime_number, generator)
+    group.build()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_batch_worker, initargs=(group,)
+    ) as executor:
+        results = executor.map(
+            _keygen_chunk,
+            [prime_number] * len(chunks),
+            [generator] * len(chunks),
+            chunks,
+            [short_exponent] * len(chunks),
+        )
+        return [keys for chunk in results for keys in chunk]
+
+
+def compute_shared_secret_keys(
+    publics: Iterable[int],
+    private: int,
+    prime_number: int,
+    workers: Optional[int] = None,
+) -> list[int]:
+    # Same as [compute_shared_secret_key(public, private, prime_number) for
+    # public in publics], on a process pool (inline with workers == 1)
+    publics = list(publics)
+    workers = workers or os.cpu_count() or 1
+    chunks = [
+        publics[start : start + BATCH_CHUNK_SIZE]
+        for start in range(0, len(publics), BATCH_CHUNK_SIZE)
+    ]
+    if workers == 1 or len(chunks) <= 1:
+        return _shared_secret_chunk(publics, private, prime_number)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _shared_secret_chunk,
+            chunks,
+            [private] * len(chunks),
+            [prime_number] * len(chunks),
+        )
+        return [secret for chunk in results for secret in chunk]
@@ -0,0 +1,108 @@
+import os
+import struct
+from typing import (
+    Union,
+)
+
+from cryptography.exceptions import (
+    InvalidTag,
+)
+from cryptography.hazmat.primitives import (
+    hashes,
+)
+from cryptography.hazmat.primitives.asymmetric import (
+    padding,
+    rsa,
+)
+
+from cryptoy import (
+    aes_cipher,
+)
+from cryptoy.rsa_cipher import (
+    RSAPrivateKey,
+    RSAPublicKey,
+    as_private_key,
+    as_public_key,
+    crt_key,
+)
+
+# Hybrid encryption: the body is encrypted with a random AES-256-GCM key, and
+# only that key is encrypted with RSA, so the RSA cost is paid once per message.
+# Container layout:
+#   ENVELOPE_MAGIC, ENVELOPE_VERSION, wrapped key length (ENVELOPE_HEADER)
+#   wrapped key (the AES key encrypted with RSA-OAEP and the RSA public key)
+#   nonce (NONCE_SIZE bytes)
+#   AES-GCM ciphertext and tag
+# The header and the wrapped key are authenticated as associated data.
+ENVELOPE_MAGIC = b"CENV"
+ENVELOPE_VERSION = 1
+ENVELOPE_HEADER = struct.Struct(">4sBH")
+
+AES_KEY_SIZE = 32
+NONCE_SIZE = 12
+
+# The key wrap is randomized, unlike rsa_cipher.encrypt_block
+OAEP = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None,
+)
+
+
+def wrap_key(aes_key: bytes, public_key: Union[tuple, RSAPublicKey]) -> bytes:
+    public_key = as_public_key(public_key)
+    numbers = rsa.RSAPublicNumbers(public_key.e, public_key.n)
+    return numbers.public_key().encrypt(aes_key, OAEP)
+
+
+def unwrap_key(wrapped_key: bytes, key: Union[dict, RSAPrivateKey]) -> bytes:
+    # Raises ValueError when wrapped_key was not wrapped for this key
+    key = as_private_key(key)
+    e, n = key.public_key.e, key.public_key.n
+    crt = key.crt
+    if crt is None:
+        # Legacy keys only have d, p and q are recovered from it
+        crt = crt_key(*rsa.rsa_recover_prime_factors(n, e, key.d), key.d)
+    numbers = rsa.RSAPrivateNumbers(
+        crt.p, crt.q, key.d, crt.dp, crt.dq, crt.qinv, rsa.RSAPublicNumbers(e, n)
+    )
+    return numbers.private_key().decrypt(wrapped_key, OAEP)
+
+
+def encrypt(
+    msg: Union[bytes, bytearray], public_key: Union[tuple, RSAPublicKey]
+) -> bytes:
+    aes_key = os.urandom(AES_KEY_SIZE)
+    nonce = os.urandom(NONCE_SIZE)
+    wrapped_key = wrap_key(aes_key, public_key)
+    header = (
+        ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION, len(wrapped_key))
+        + wrapped_key
+    )
+    return header + nonce + aes_cipher.encrypt(bytes(msg), aes_key, nonce, header)
+
+
+def decrypt(
+    envelope: Union[bytes, bytearray], key: Union[dict, RSAPrivateKey]
+) -> bytes:
+    envelope = bytes(envelope)
+    if len(envelope) < ENVELOPE_HEADER.size:
+        raise ValueError("truncated envelope")
+    magic, version, wrapped_length = ENVELOPE_HEADER.unpack_from(envelope)
+    if magic != ENVELOPE_MAGIC:
+        raise ValueError("not an envelope")
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"unsupported envelope version {version}")
+    body = ENVELOPE_HEADER.size + wrapped_length + NONCE_SIZE
+    if len(envelope) < body:
+        raise ValueError("truncated envelope")
+
+    header = envelope[: ENVELOPE_HEADER.size + wrapped_length]
+    nonce = envelope[len(header) : body]
+    # A wrong key fails the OAEP decoding, a tampered body the GCM
+    # authentication
+    try:
+        aes_key = unwrap_key(header[ENVELOPE_HEADER.size :], key)
+        return aes_cipher.decrypt(envelope[body:], aes_key, nonce, header)
+    except (ValueError, InvalidTag) as e:
+        raise RuntimeError("envelope authentication failed") from e
@@ -0,0 +1,182 @@
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import (
+    Iterable,
+    Sequence,
+)
+from pathlib import (
+    Path,
+)
+from types import (
+    TracebackType,
+)
+from typing import (
+    Optional,
+    Union,
+    overload,
+)
+
+from cryptoy.rsa_cipher import (
+    CRTKey,
+    RSAPrivateKey,
+    RSAPublicKey,
+)
+
+# Binary file of RSA keys, read through mmap without parsing the whole file:
+#   KEYRING_HEADER: KEYRING_MAGIC, KEYRING_VERSION, number of keys
+#   offset table: count + 1 OFFSET entries, key i spans [offset i, offset i + 1)
+#   records: a kind byte, then each integer as its byte length (INT_LENGTH)
+#   followed by its big-endian bytes
+#     PUBLIC_KEY:      e, n
+#     PRIVATE_KEY:     e, n, d
+#     PRIVATE_CRT_KEY: e, n, d, p, q, dp, dq, qinv
+# The file holds private keys, so it is only readable by its owner.
+KEYRING_MAGIC = b"CKRG"
+KEYRING_VERSION = 1
+KEYRING_HEADER = struct.Struct(">4sBI")
+OFFSET = struct.Struct(">Q")
+INT_LENGTH = struct.Struct(">I")
+
+PUBLIC_KEY = 0
+PRIVATE_KEY = 1
+PRIVATE_CRT_KEY = 2
+RECORD_INTEGERS = {PUBLIC_KEY: 2, PRIVATE_KEY: 3, PRIVATE_CRT_KEY: 8}
+
+Key = Union[RSAPublicKey, RSAPrivateKey]
+
+
+def encode_key(key: Key) -> bytes:
+    if isinstance(key, RSAPublicKey):
+        kind, integers = PUBLIC_KEY, [key.e, key.n]
+    else:
+        kind = PRIVATE_KEY if key.crt is None else PRIVATE_CRT_KEY
+        integers = [key.public_key.e, key.public_key.n, key.d, *(key.crt or ())]
+
+    record = bytearray([kind])
+    for value in integers:
+        data = value.to_bytes((value.bit_length() + 7) // 8, "big")
+        record += INT_LENGTH.pack(len(data))
+        record += data
+    return bytes(record)
+
+
+def decode_key(record: bytes) -> Key:
+    kind = record[0] if record else None
+    if kind not in RECORD_INTEGERS:
+        raise ValueError(f"unknown key record kind {kind}")
+    integers = []
+    offset = 1
+    for _ in range(RECORD_INTEGERS[kind]):
+        if offset + INT_LENGTH.size > len(record):
+            raise ValueError("invalid key record length")
+        (length,) = INT_LENGTH.unpack_from(record, offset)
+        offset += INT_LENGTH.size
+        if offset + length > len(record):
+            raise ValueError("invalid key record length")
+        integers.append(int.from_bytes(record[offset : offset + length], "big"))
+        offset += length
+    if offset != len(record):
+        raise ValueError("invalid key record length")
+
+    public_key = RSAPublicKey(integers[0], integers[1])
+    if kind == PUBLIC_KEY:
+        return public_key
+    crt = CRTKey(*integers[3:]) if kind == PRIVATE_CRT_KEY else None
+    return RSAPrivateKey(public_key, integers[2], crt)
+
+
+def save_keys(path: Union[str, Path], keys: Iterable[Key]) -> int:
+    # Writes keys to path, returns the number of keys
+    path = Path(path)
+    records = [encode_key(key) for key in keys]
+    offset = KEYRING_HEADER.size + OFFSET.size * (len(records) + 1)
+    offsets = [offset]
+    for record in records:
+        offset += len(record)
+        offsets.append(offset)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # mkstemp creates the file readable by its owner only
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(KEYRING_HEADER.pack(KEYRING_MAGIC, KEYRING_VERSION, len(records)))
+            tmp.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+            tmp.writelines(records)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return len(records)
+
+
+class Keyring(Sequence[Key]):
+    # Keys of a file written by save_keys. Opening it only reads the header,
+    # each key is decoded from the mapping when it is accessed.
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mapped) < KEYRING_HEADER.size:
+                raise ValueError("truncated keyring")
+            magic, version, self._count = KEYRING_HEADER.unpack_from(self._mapped)
+            if magic != KEYRING_MAGIC:
+                raise ValueError("not a keyring")
+            if version != KEYRING_VERSION:
+                raise ValueError(f"unsupported keyring version {version}")
+            table_end = KEYRING_HEADER.size + OFFSET.size * (self._count + 1)
+            if table_end > len(self._mapped):
+                raise ValueError("truncated keyring")
+            if self._offset(self._count) != len(self._mapped):
+                raise ValueError("truncated keyring")
+        except BaseException:
+            self._mapped.close()
+            raise
+
+    def __enter__(self) -> "Keyring":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mapped.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Key:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Key]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Key, list[Key]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("keyring index out of range")
+        return decode_key(self._mapped[self._offset(index) : self._offset(index + 1)])
+
+    def _offset(self, index: int) -> int:
+        (offset,) = OFFSET.unpack_from(
+            self._mapped, KEYRING_HEADER.size + OFFSET.size * index
+        )
+        return offset
+
+
+def load_keys(path: Union[str, Path]) -> list[Key]:
+    with Keyring(path) as keyring:
+        return list(keyring)
@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import (
+    Iterator,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from pathlib import (
+    Path,
+)
+from typing import (
+    Any,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from cryptoy.passwords import (
+    build_hash_index,
+)
+
+# Dictionary attack of passwords.attack on a process pool: the wordlist file is
+# split into shards of about SHARD_SIZE bytes, each worker hashes the lines of
+# its shard and only sends back the hits. The digests to find are sent once
+# to each worker, when it starts.
+SHARD_SIZE = 4 * 2**20
+
+# Salted databases (passwords.fix) need one pass over the wordlist per user:
+# audit_salted schedules (user, shard) work units of SALTED_SHARD_SIZE bytes
+# and saves its progress every CHECKPOINT_INTERVAL seconds
+SALTED_SHARD_SIZE = 2**20
+CHECKPOINT_INTERVAL = 30.0
+CHECKPOINT_VERSION = 1
+
+
+class ShardStats(NamedTuple):
+    pid: int
+    words: int
+    seconds: float
+
+
+class AuditReport:
+    # Filled by audit() while it runs: words hashed and time spent per worker
+    def __init__(self) -> None:
+        self.workers: dict[int, ShardStats] = {}
+        self.elapsed = 0.0
+
+    @property
+    def words(self) -> int:
+        return sum(stats.words for stats in self.workers.values())
+
+    @property
+    def hashes_per_second(self) -> float:
+        return self.words / self.elapsed if self.elapsed else 0.0
+
+    def add(self, stats: ShardStats) -> None:
+        previous = self.workers.get(stats.pid, ShardStats(stats.pid, 0, 0.0))
+        self.workers[stats.pid] = ShardStats(
+            stats.pid, previous.words + stats.words, previous.seconds + stats.seconds
+        )
+
+
+def wordlist_shards(
+    path: Union[str, Path], shard_size: int = SHARD_SIZE
+) -> list[tuple[int, int]]:
+    # Byte ranges [start, end) covering the file. A line belongs to the shard
+    # holding its first byte.
+    size = os.path.getsize(path)
+    return [
+        (start, min(start + shard_size, size)) for start in range(0, size, shard_size)
+    ]
+
+
+def read_shard(path: Union[str, Path], start: int, end: int) -> tuple[int, bytes]:
+    # (offset, data): the lines of the file starting in [start, end), read at
+    # once, and the offset of the first one
+    with open(path, "rb") as f:
+        if start > 0:
+            # Skip the line started in the previous shard
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        if position >= end:
+            return position, b""
+        data = f.read(end - position)
+        if not data.endswith(b"\n"):
+            # Finish the last line, started in this shard
+            data += f.readline()
+    return position, data
+
+
+def split_lines(data: bytes) -> list[bytes]:
+    # Lines of data split on "\n", without the empty string after the last one
+    lines = data.split(b"\n")
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def iter_shard_lines(path: Union[str, Path], start: int, end: int) -> Iterator[bytes]:
+    # Lines of the file starting in [start, end), without their line ending
+    _offset, data = read_shard(path, start, end)
+    for line in split_lines(data):
+        yield line.rstrip(b"\r")
+
+
+_digests: frozenset[bytes] = frozenset()
+
+
+def _init_worker(digests: frozenset[bytes]) -> None:
+    global _digests
+    _digests = digests
+
+
+def _audit_shard(
+    path: str, start: int, end: int
+) -> tuple[list[tuple[bytes, bytes]], ShardStats]:
+    # The words are hashed as bytes, like hash_password does after encoding
+    begin = time.perf_counter()
+    hits = []
+    words = 0
+    sha3_256 = hashlib.sha3_256
+    digests = _digests
+    for word in iter_shard_lines(path, start, end):
+        words += 1
+        digest = sha3_256(word).digest()
+        if digest in digests:
+            hits.append((digest, word))
+    stats = ShardStats(os.getpid(), words, time.perf_counter() - begin)
+    return hits, stats
+
+
+def audit(
+    path: Union[str, Path],
+    passwords_database: dict[str, str],
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    report: Optional[AuditReport] = None,
+) -> dict[str, str]:
+    # Same result as passwords.attack(iter_wordlist(path), passwords_database)
+    # for a UTF-8 wordlist (lines that are not valid UTF-8 are skipped)
+    workers = workers or os.cpu_count() or 1
+    report = report if report is not None else AuditReport()
+    begin = time.perf_counter()
+    index = {
+        bytes.fromhex(password_hash): users
+        for password_hash, users in build_hash_index(passwords_database).items()
+    }
+    users_and_passwords: dict[str, str] = {}
+    shards = enumerate(wordlist_shards(path, shard_size))
+    pending: set[Future] = set()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(frozenset(index),)
+    ) as executor:
+        try:
+            # Shards are submitted in order, and the hits of each shard in
+            # order, so the first word of the list wins like in attack
+            results: dict[int, list[tuple[bytes, bytes]]] = {}
+            order: dict[Future, int] = {}
+            next_shard = 0
+            while index:
+                for number, (start, end) in shards:
+                    future = executor.submit(_audit_shard, str(path), start, end)
+                    order[future] = number
+                    pending.add(future)
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    hits, stats = future.result()
+                    report.add(stats)
+                    results[order.pop(future)] = hits
+                while next_shard in results and index:
+                    for digest, word in results.pop(next_shard):
+                        try:
+                            password = word.decode()
+                        except UnicodeDecodeError:
+                            continue
+                        for user in index.pop(digest, ()):
+                            users_and_passwords[user] = password
+                    next_shard += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            for future in wait(pending).done:
+                if not future.cancelled() and future.exception() is None:
+                    report.add(future.result()[1])
+            report.elapsed = time.perf_counter() - begin
+
+    return users_and_passwords
+
+
+# Last shard read by the worker: the units are submitted shard by shard, so
+# consecutive units of a worker usually share it
+_shard_cache: tuple[tuple[str, int, int], list[bytes]] = (("", 0, 0), [])
+
+
+def _shard_lines(path: str, start: int, end: int) -> list[bytes]:
+    global _shard_cache
+    key = (path, start, end)
+    if _shard_cache[0] != key:
+        _shard_cache = (key, list(iter_shard_lines(path, start, end)))
+    return _shard_cache[1]
+
+
+def _audit_salted_unit(
+    path: str, start: int, end: int, salt: str, digest: bytes
+) -> tuple[Optional[str], ShardStats]:
+    # hash_password(salt + word): the salt is absorbed once, then the state is
+    # copied for each word. Lines that are not valid UTF-8 are skipped, like
+    # in audit.
+    begin = time.perf_counter()
+    prefix = hashlib.sha3_256(salt.encode())
+    words = 0
+    found = None
+    for word in _shard_lines(path, start, end):
+        words += 1
+        state = prefix.copy()
+        state.update(word)
+        if state.digest() == digest:
+            try:
+                found = word.decode()
+            except UnicodeDecodeError:
+                continue
+            break
+    return found, ShardStats(os.getpid(), words, time.perf_counter() - begin)
+
+
+def database_digest(new_database: dict[str, dict[str, str]]) -> str:
+    # Identifies the users, salts and hashes a checkpoint was made for
+    entries = sorted(
+        (user, entry["password_salt"], entry["password_hash"])
+        for user, entry in new_database.items()
+    )
+    return hashlib.sha3_256(json.dumps(entries).encode()).hexdigest()
+
+
+def load_checkpoint(
+    checkpoint: Union[str, Path], wordlist_size: int, shard_size: int, database: str
+) -> tuple[dict[str, str], dict[str, set[int]]]:
+    # Users found and shards done per user, saved by a previous audit_salted
+    # of the same wordlist and database (see database_digest)
+    path = Path(checkpoint)
+    if not path.exists():
+        return {}, {}
+    state = json.loads(path.read_text())
+    if (
+        state.get("version") != CHECKPOINT_VERSION
+        or state["wordlist_size"] != wordlist_size
+        or state["shard_size"] != shard_size
+        or state["database"] != database
+    ):
+        raise ValueError(f"checkpoint {path} is for another audit")
+    done = {user: set(shards) for user, shards in state["done"].items()}
+    return state["found"], done
+
+
+def save_checkpoint(
+    checkpoint: Union[str, Path],
+    wordlist_size: int,
+    shard_size: int,
+    database: str,
+    found: dict[str, str],
+    done: dict[str, set[int]],
+) -> None:
+    # The checkpoint holds cracked passwords: mkstemp creates it readable by
+    # its owner only, and it is replaced atomically
+    path = Path(checkpoint)
+    state: dict[str, Any] = {
+        "version": CHECKPOINT_VERSION,
+        "wordlist_size": wordlist_size,
+        "shard_size": shard_size,
+        "database": database,
+        "found": found,
+        "done": {user: sorted(shards) for user, shards in done.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(state, tmp)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def audit_salted(
+    path: Union[str, Path],
+    new_database: dict[str, dict[str, str]],
+    workers: Optional[int] = None,
+    shard_size: int = SALTED_SHARD_SIZE,
+    checkpoint: Optional[Union[str, Path]] = None,
+    report: Optional[AuditReport] = None,
+) -> dict[str, str]:
+    # Dictionary attack of a database written by passwords.fix, returns the
+    # passwords found by user. The (user, shard) units are pulled by the idle
+    # workers from the pool queue, which is kept short so that the units of
+    # the users already found are never sent. With checkpoint, the progress is
+    # saved there, and an interrupted audit resumes from it.
+    workers = workers or os.cpu_count() or 1
+    report = report if report is not None else AuditReport()
+    begin = time.perf_counter()
+    shards = wordlist_shards(path, shard_size)
+    wordlist_size = os.path.getsize(path)
+    database = database_digest(new_database)
+    found: dict[str, str] = {}
+    done: dict[str, set[int]] = {}
+    if checkpoint is not None:
+        found, done = load_checkpoint(checkpoint, wordlist_size, shard_size, database)
+    targets = {
+        user: (entry["password_salt"], bytes.fromhex(entry["password_hash"]))
+        for user, entry in new_database.items()
+        if user not in found
+    }
+
+    units = (
+        (user, number)
+        for number in range(len(shards))
+        for user in targets
+        if user not in found and number not in done.get(user, ())
+    )
+    pending: dict[Future, tuple[str, int]] = {}
+    last_checkpoint = time.monotonic()
+
+    def record(future: Future) -> None:
+        user, number = pending.pop(future)
+        word, stats = future.result()
+        report.add(stats)
+        if word is not None:
+            found[user] = word
+            done.pop(user, None)
+        elif user not in found:
+            done.setdefault(user, set()).add(number)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                for user, number in units:
+                    salt, digest = targets[user]
+                    start, end = shards[number]
+                    future = executor.submit(
+                        _audit_salted_unit, str(path), start, end, salt, digest
+                    )
+                    pending[future] = (user, number)
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    record(future)
+
+                if (
+                    checkpoint is not None
+                    and time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL
+                ):
+                    save_checkpoint(
+                        checkpoint, wordlist_size, shard_size, database, found, done
+                    )
+                    last_checkpoint = time.monotonic()
+        finally:
+            # The units already running are recorded, the others are redone on
+            # resume
+            for future in pending:
+                future.cancel()
+            for future in wait(pending).done:
+                if future.cancelled() or future.exception() is not None:
+                    del pending[future]
+                else:
+                    record(future)
+            report.elapsed = time.perf_counter() - begin
+            if checkpoint is not None:
+                save_checkpoint(
+                    checkpoint, wordlist_size, shard_size, database, found, done
+                )
+
+    return {user: found[user] for user in new_database if user in found}
@@ -0,0 +1,230 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import (
+    Iterator,
+)
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+from pathlib import (
+    Path,
+)
+from types import (
+    TracebackType,
+)
+from typing import (
+    Optional,
+    Union,
+)
+
+from cryptoy.password_audit import (
+    read_shard,
+    split_lines,
+    wordlist_shards,
+)
+from cryptoy.passwords import (
+    build_hash_index,
+)
+
+# Index of a wordlist by password hash, built once and reused by every audit:
+# INDEX_HEADER (INDEX_MAGIC, INDEX_VERSION, size of the wordlist) followed by
+# RECORD entries (sha3_256 digest of a line, offset of the line in the
+# wordlist) sorted by digest. Looking a hash up is a binary search in the
+# memory-mapped file.
+INDEX_MAGIC = b"CPIX"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct(">4sB3xQ")
+RECORD = struct.Struct(">32sQ")
+DIGEST_SIZE = 32
+
+# The wordlist is hashed in shards of RUN_SIZE bytes, one per task. Each shard
+# gives a sorted run written to a temporary file, the runs are then merged.
+RUN_SIZE = 8 * 2**20
+
+# Bytes read at once from each run while merging
+MERGE_BUFFER_SIZE = 2**16
+
+# Runs merged at once, so that a merge never holds more files open than this.
+# Above, the runs are merged in several passes.
+MERGE_FAN_IN = 64
+
+
+def _build_run(path: str, start: int, end: int, run_dir: str) -> str:
+    offset, data = read_shard(path, start, end)
+    records = []
+    sha3_256 = hashlib.sha3_256
+    for line in split_lines(data):
+        digest = sha3_256(line.rstrip(b"\r")).digest()
+        records.append(RECORD.pack(digest, offset))
+        offset += len(line) + 1
+    records.sort()
+
+    fd, run_name = tempfile.mkstemp(dir=run_dir, suffix=".run")
+    with os.fdopen(fd, "wb") as run:
+        run.writelines(records)
+    return run_name
+
+
+def _iter_run(run_name: str) -> Iterator[bytes]:
+    with open(run_name, "rb") as run:
+        while True:
+            data = run.read(MERGE_BUFFER_SIZE // RECORD.size * RECORD.size)
+            if not data:
+                return
+            for i in range(0, len(data), RECORD.size):
+                yield data[i : i + RECORD.size]
+
+
+def _merge_runs(runs: list[str], run_dir: str) -> str:
+    # Merges runs into a new run, and removes them
+    fd, run_name = tempfile.mkstemp(dir=run_dir, suffix=".run")
+    with os.fdopen(fd, "wb") as run:
+        run.writelines(heapq.merge(*map(_iter_run, runs)))
+    for merged in runs:
+        os.unlink(merged)
+    return run_name
+
+
+def build_index(
+    wordlist: Union[str, Path],
+    index: Union[str, Path],
+    workers: Optional[int] = None,
+    run_size: int = RUN_SIZE,
+) -> int:
+    # Writes the index of wordlist to index, returns the number of records.
+    # Memory use is bounded by run_size per worker, whatever the wordlist size.
+    index = Path(index)
+    index.parent.mkdir(parents=True, exist_ok=True)
+    size = os.path.getsize(wordlist)
+    count = 0
+
+    with tempfile.TemporaryDirectory(dir=index.parent) as run_dir:
+        shards = wordlist_shards(wordlist, run_size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            runs = list(
+                executor.map(
+                    _build_run,
+                    [str(wordlist)] * len(shards),
+                    [start for start, _end in shards],
+                    [end for _start, end in shards],
+                    [run_dir] * len(shards),
+                )
+            )
+        while len(runs) > MERGE_FAN_IN:
+            runs = [
+                _merge_runs(runs[i : i + MERGE_FAN_IN], run_dir)
+                for i in range(0, len(runs), MERGE_FAN_IN)
+            ]
+
+        fd, tmp_name = tempfile.mkstemp(dir=index.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, size))
+                # Records compare like their digests, then their offsets
+                for record in heapq.merge(*map(_iter_run, runs)):
+                    tmp.write(record)
+                    count += 1
+            os.replace(tmp_name, index)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    return count
+
+
+class PasswordIndex:
+    # Lookups in an index written by build_index. Only the pages visited by
+    # the binary searches are read from the file.
+
+    def __init__(self, index: Union[str, Path], wordlist: Union[str, Path]) -> None:
+        self.wordlist = Path(wordlist)
+        with open(index, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mapped) < INDEX_HEADER.size:
+                raise ValueError("truncated password index")
+            magic, version, size = INDEX_HEADER.unpack_from(self._mapped)
+            if magic != INDEX_MAGIC:
+                raise ValueError("not a password index")
+            if version != INDEX_VERSION:
+                raise ValueError(f"unsupported password index version {version}")
+            if (len(self._mapped) - INDEX_HEADER.size) % RECORD.size:
+                raise ValueError("truncated password index")
+            if size != os.path.getsize(self.wordlist):
+                raise ValueError("password index built for another wordlist")
+        except BaseException:
+            self._mapped.close()
+            raise
+        self._count = (len(self._mapped) - INDEX_HEADER.size) // RECORD.size
+
+    def __enter__(self) -> "PasswordIndex":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mapped.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _digest(self, i: int) -> bytes:
+        start = INDEX_HEADER.size + i * RECORD.size
+        return self._mapped[start : start + DIGEST_SIZE]
+
+    def find(self, digest: bytes) -> list[int]:
+        # Offsets in the wordlist of the lines hashing to digest
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._digest(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        offsets = []
+        while low < self._count and self._digest(low) == digest:
+            _digest, offset = RECORD.unpack_from(
+                self._mapped, INDEX_HEADER.size + low * RECORD.size
+            )
+            offsets.append(offset)
+            low += 1
+        return offsets
+
+    def lookup(self, password_hash: str) -> Optional[str]:
+        # First password of the wordlist with this hash_password hash, if any.
+        # Lines that are not valid UTF-8 are skipped, like in audit. The index
+        # only records the size of the wordlist, so each line is hashed again:
+        # after an edit keeping the size, stale offsets give no password
+        # rather than a wrong one.
+        digest = bytes.fromhex(password_hash)
+        with open(self.wordlist, "rb") as f:
+            for offset in self.find(digest):
+                f.seek(offset)
+                line = f.readline().rstrip(b"\n").rstrip(b"\r")
+                if hashlib.sha3_256(line).digest() != digest:
+                    continue
+                try:
+                    return line.decode()
+                except UnicodeDecodeError:
+                    continue
+        return None
+
+    def attack(self, passwords_database: dict[str, str]) -> dict[str, str]:
+        # Same result as passwords.attack(iter_wordlist(wordlist), ...), with
+        # one lookup per distinct hash of the database
+        users_and_passwords = {}
+        for password_hash, users in build_hash_index(passwords_database).items():
+            password = self.lookup(password_hash)
+            if password is not None:
+                for user in users:
+                    users_and_passwords[user] = password
+        return users_and_passwords
@@ -1,8 +1,18 @@
 import hashlib
 import os
+from collections.abc import (
+    Iterable,
+    Iterator,
+)
+from pathlib import (
+    Path,
+)
 from random import (
     Random,
 )
+from typing import (
+    Union,
+)
 
 import names
 
@@ -27,14 +37,39 @@ def generate_users_and_password_hashes(
     return users_and_password_hashes
 
 
-def attack(passwords: list[str], passwords_database: dict[str, str]) -> dict[str, str]:
+def build_hash_index(passwords_database: dict[str, str]) -> dict[str, list[str]]:
+    # password hash -> every user having this hash
+    index: dict[str, list[str]] = {}
+    for user, password_hash in passwords_database.items():
+        index.setdefault(password_hash, []).append(user)
+    return index
+
+
+def iter_wordlist(path: Union[str, Path], encoding: str = "utf-8") -> Iterator[str]:
+    # Lines of the file, read lazily, without their line ending. Lines end
+    # with "\n" only, a lone "\r" is kept, like in password_audit
+    with open(path, encoding=encoding, newline="\n") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def attack(
+    passwords: Iterable[str], passwords_database: dict[str, str]
+) -> dict[str, str]:
+    # passwords can be any iterable, such as iter_wordlist(path). Each hash is
+    # looked up once in the index, and the attack stops as soon as every user
+    # is found.
     users_and_passwords = {}
-    
+    index = build_hash_index(passwords_database)
+
     for password in passwords:
-        hashed_password = hash_password(password)
-        if hashed_password in passwords_database.values():
-            user = list(passwords_database.keys())[list(passwords_database.values()).index(hashed_password)]
+        users = index.pop(hash_password(password), None)
+        if users is None:
+            continue
+        for user in users:
             users_and_passwords[user] = password
+        if not index:
+            break
     # A implémenter
     # Doit calculer le mots de passe de chaque utilisateur grace à une attaque par dictionnaire
 
@@ -42,7 +77,7 @@ def attack(passwords: list[str], passwords_database: dict[str, str]) -> dict[str
 
 
 def fix(
-    passwords: list[str], passwords_database: dict[str, str]
+    passwords: Iterable[str], passwords_database: dict[str, str]
 ) -> dict[str, dict[str, str]]:
     users_and_passwords = attack(passwords, passwords_database)
 
@@ -0,0 +1,169 @@
+import mmap
+import os
+import tempfile
+from array import (
+    array,
+)
+from collections import (
+    OrderedDict,
+)
+from pathlib import (
+    Path,
+)
+from threading import (
+    Lock,
+)
+from types import (
+    TracebackType,
+)
+from typing import (
+    Final,
+    Optional,
+    Union,
+)
+
+# Permutation tables of size 0x110000 need 32 bits per entry
+TYPECODE: Final = "I"
+ITEMSIZE = array(TYPECODE).itemsize
+
+
+def build_affine_table(a: int, b: int, n: int) -> array:
+    # table[i] == (a * i + b) % n, stored as a compact array of unsigned ints
+    table = array(TYPECODE, bytes(n * ITEMSIZE))
+    x = b
+    for i in range(n):
+        table[i] = x
+        x += a
+        if x >= n:
+            x -= n
+    return table
+
+
+class PermutationCache:
+    # LRU cache of affine permutation tables keyed by (a, b, n).
+    #
+    # Tables are kept as memoryviews over compact arrays, within max_entries
+    # tables and max_bytes bytes (the most recent table is always kept). When
+    # spill_dir is set, tables are written there once and memory-mapped
+    # read-only, so they survive eviction and are shared between the processes
+    # using the same directory. clear() and close() release the tables and
+    # close their mappings, the tables returned by get must not be used after.
+
+    def __init__(
+        self,
+        max_entries: int = 8,
+        max_bytes: int = 64 * 2**20,
+        spill_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._tables: OrderedDict[tuple[int, int, int], memoryview] = OrderedDict()
+        self._mapped: dict[tuple[int, int, int], mmap.mmap] = {}
+        self._nbytes = 0
+        self._lock = Lock()
+
+    def __enter__(self) -> "PermutationCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._tables
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def configure(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        spill_dir: Optional[Union[str, Path]] = None,
+    ) -> None:
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if spill_dir is not None:
+                self.spill_dir = Path(spill_dir)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            for key, table in self._tables.items():
+                mapped = self._mapped.pop(key, None)
+                if mapped is not None:
+                    table.release()
+                    mapped.close()
+            self._tables.clear()
+            self._nbytes = 0
+
+    def close(self) -> None:
+        self.clear()
+
+    def get(self, a: int, b: int, n: int) -> memoryview:
+        key = (a, b % n, n)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+
+        # Built outside the lock so that other keys stay available meanwhile
+        table, mapped = self._load(*key)
+        with self._lock:
+            if key not in self._tables:
+                self._tables[key] = table
+                if mapped is not None:
+                    self._mapped[key] = mapped
+                self._nbytes += table.nbytes
+                self._evict()
+            elif mapped is not None:
+                # Loaded concurrently by another thread
+                table.release()
+                mapped.close()
+            return self._tables.get(key, table)
+
+    def _evict(self) -> None:
+        # An evicted table may still be in use by the caller of get, so its
+        # mapping is closed when its last view goes away rather than here
+        while len(self._tables) > 1 and (
+            len(self._tables) > self.max_entries or self._nbytes > self.max_bytes
+        ):
+            key, table = self._tables.popitem(last=False)
+            self._mapped.pop(key, None)
+            self._nbytes -= table.nbytes
+
+    def _load(self, a: int, b: int, n: int) -> tuple[memoryview, Optional[mmap.mmap]]:
+        if self.spill_dir is None:
+            return memoryview(build_affine_table(a, b, n)), None
+
+        path = self.spill_dir / f"affine-{n}-{a}-{b}-{TYPECODE}{ITEMSIZE}.perm"
+        if not path.exists():
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            # Written to a temporary file first so that concurrent workers
+            # never map a partially written table
+            fd, tmp_name = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    build_affine_table(a, b, n).tofile(tmp)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with memoryview(mapped) as view:
+            return view.cast(TYPECODE), mapped
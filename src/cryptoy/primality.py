@@ -0,0 +1,208 @@
+import random
+from collections.abc import (
+    Iterable,
+    Iterator,
+)
+from functools import (
+    lru_cache,
+)
+from math import (
+    gcd,
+    isqrt,
+    prod,
+)
+from typing import (
+    Optional,
+)
+
+# Miller-Rabin is deterministic below each bound with the associated bases
+# (Jaeschke, Sorenson and Webster)
+DETERMINISTIC_BASES = (
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (25326001, (2, 3, 5)),
+    (3215031751, (2, 3, 5, 7)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (318665857834031151167461, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+    (3317044064679887385961981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+)
+DETERMINISTIC_LIMIT = DETERMINISTIC_BASES[-1][0]
+
+# Trial division skips the multiples of 2, 3 and 5: from 7, the next divisor
+# is given by these increments
+WHEEL_INCREMENTS = (4, 2, 4, 2, 4, 6, 2, 6)
+TRIAL_DIVISION_LIMIT = 1000
+
+# Number of verdicts kept by probable_prime, shared by is_prime and
+# is_prime_many
+VERDICT_CACHE_SIZE = 4096
+
+
+def wheel_divisors(limit: int) -> Iterator[int]:
+    # 2, 3, 5 then the numbers up to limit that are coprime with 30
+    yield from (d for d in (2, 3, 5) if d <= limit)
+    d = 7
+    i = 0
+    while d <= limit:
+        yield d
+        d += WHEEL_INCREMENTS[i]
+        i = (i + 1) % len(WHEEL_INCREMENTS)
+
+
+# Product of the primes below TRIAL_DIVISION_LIMIT, a single gcd with it
+# replaces the trial divisions of large numbers
+SMALL_PRIMES_PRODUCT = prod(
+    d
+    for d in wheel_divisors(TRIAL_DIVISION_LIMIT)
+    if all(d % p for p in wheel_divisors(isqrt(d)))
+)
+
+
+def trial_division(n: int, limit: int = TRIAL_DIVISION_LIMIT) -> Optional[bool]:
+    # Primality of n when trial division up to limit settles it, None otherwise
+    if n < 2:
+        return False
+    for d in wheel_divisors(limit):
+        if d * d > n:
+            return n > 1
+        if n % d == 0:
+            return n == d
+    return None
+
+
+def deterministic_bases(n: int) -> tuple[int, ...]:
+    for bound, bases in DETERMINISTIC_BASES:
+        if n < bound:
+            return bases
+    raise ValueError(f"no deterministic bases for n >= {DETERMINISTIC_LIMIT}")
+
+
+def strong_probable_prime(n: int, a: int) -> bool:
+    # Miller-Rabin round with base a, for an odd n > 2
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def jacobi(a: int, n: int) -> int:
+    # Jacobi symbol (a / n) for an odd n > 0
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas_probable_prime(n: int) -> bool:
+    # Strong Lucas test with Selfridge's parameters, for an odd n > 2
+    if isqrt(n) ** 2 == n:
+        return False
+
+    # First D of 5, -7, 9, -11, ... with (D / n) == -1
+    d = 5
+    while True:
+        symbol = jacobi(d, n)
+        if symbol == -1:
+            break
+        if symbol == 0 and abs(d) != n:
+            return False
+        d = -d - 2 if d > 0 else -d + 2
+    p, q = 1, (1 - d) // 4
+
+    def halve(x: int) -> int:
+        # x / 2 modulo the odd n
+        x %= n
+        return (x + n if x % 2 else x) // 2
+
+    # n + 1 == k * 2 ** s with k odd
+    k, s = n + 1, 0
+    while k % 2 == 0:
+        k //= 2
+        s += 1
+
+    # U_k, V_k and Q ** k modulo n, from the most significant bit of k
+    u, v, q_k = 1, p, q % n
+    for bit in f"{k:b}"[1:]:
+        u, v = u * v % n, (v * v - 2 * q_k) % n
+        q_k = q_k * q_k % n
+        if bit == "1":
+            u, v = halve(p * u + v), halve(d * u + p * v)
+            q_k = q_k * q % n
+
+    if u == 0 or v == 0:
+        return True
+    for _ in range(s - 1):
+        v = (v * v - 2 * q_k) % n
+        q_k = q_k * q_k % n
+        if v == 0:
+            return True
+    return False
+
+
+def baillie_psw(n: int) -> bool:
+    # No composite passing both tests is known
+    return strong_probable_prime(n, 2) and strong_lucas_probable_prime(n)
+
+
+def is_prime(n: int, method: str = "bpsw", rounds: int = 40) -> bool:
+    # Exact below DETERMINISTIC_LIMIT. Above, method is either "bpsw"
+    # (Baillie-PSW) or "mr" (Miller-Rabin with rounds random bases).
+    if n < TRIAL_DIVISION_LIMIT**2:
+        verdict = trial_division(n)
+        if verdict is not None:
+            return verdict
+    # n > TRIAL_DIVISION_LIMIT from here
+    if gcd(n, SMALL_PRIMES_PRODUCT) != 1:
+        return False
+    return probable_prime(n, method, rounds)
+
+
+@lru_cache(maxsize=VERDICT_CACHE_SIZE)
+def probable_prime(n: int, method: str = "bpsw", rounds: int = 40) -> bool:
+    # is_prime for an n > TRIAL_DIVISION_LIMIT without small prime factors
+    if n < DETERMINISTIC_LIMIT:
+        return all(strong_probable_prime(n, a) for a in deterministic_bases(n))
+    if method == "bpsw":
+        return baillie_psw(n)
+    if method == "mr":
+        return all(
+            strong_probable_prime(n, random.randrange(2, n - 1))  # noqa: S311
+            for _ in range(rounds)
+        )
+    raise ValueError(f"unknown primality method {method!r}")
+
+
+def is_prime_many(
+    numbers: Iterable[int], method: str = "bpsw", rounds: int = 40
+) -> list[bool]:
+    # The small factors of the large numbers are found with one gcd each
+    # against SMALL_PRIMES_PRODUCT, and only the survivors go through the
+    # probable prime tests. The small numbers go through is_prime.
+    verdicts = []
+    for n in numbers:
+        if n < TRIAL_DIVISION_LIMIT**2:
+            verdicts.append(is_prime(n, method, rounds))
+        else:
+            verdicts.append(
+                gcd(n, SMALL_PRIMES_PRODUCT) == 1 and probable_prime(n, method, rounds)
+            )
+    return verdicts
@@ -0,0 +1,189 @@
+import json
+import os
+import tempfile
+from collections import (
+    deque,
+)
+from collections.abc import (
+    Sequence,
+)
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+)
+from functools import (
+    partial,
+)
+from pathlib import (
+    Path,
+)
+from threading import (
+    Condition,
+)
+from types import (
+    TracebackType,
+)
+from typing import (
+    Optional,
+    Union,
+)
+
+from cryptoy.utils import (
+    draw_random_prime,
+)
+
+
+def draw_prime(bits: int) -> int:
+    return draw_random_prime(2 ** (bits - 1), 2**bits)
+
+
+class PrimePool:
+    # Stock of random primes of the given sizes, generated in the background on
+    # a process pool. Each stock holds at most capacity primes and is refilled
+    # as soon as it falls below low_water primes (counting the primes being
+    # generated).
+    #
+    # With path set, the spare primes are saved there by stop() and loaded by
+    # start(). The file is emptied as soon as it is loaded so that a prime is
+    # never handed out twice, even after a crash: two RSA keys sharing a prime
+    # are both broken. It holds secret material and is only readable by its
+    # owner.
+
+    def __init__(
+        self,
+        bits: Sequence[int] = (1024,),
+        capacity: int = 16,
+        low_water: int = 4,
+        workers: Optional[int] = None,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.bits = tuple(bits)
+        self.capacity = capacity
+        self.low_water = low_water
+        self.workers = workers
+        self.path = Path(path) if path is not None else None
+        self._stocks: dict[int, deque[int]] = {size: deque() for size in self.bits}
+        self._in_flight = dict.fromkeys(self.bits, 0)
+        self._condition = Condition()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "PrimePool":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        with self._condition:
+            if self._executor is not None:
+                return
+            self._load()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            for size in self.bits:
+                self._refill(size)
+
+    def stop(self) -> None:
+        with self._condition:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        with self._condition:
+            self._save()
+
+    def size(self, bits: int = 1024) -> int:
+        with self._condition:
+            return len(self._stocks.get(bits, ()))
+
+    def get(
+        self, bits: int = 1024, block: bool = False, timeout: Optional[float] = None
+    ) -> Optional[int]:
+        # Pops a prime from the stock, or returns None when it is empty (after
+        # waiting up to timeout seconds with block) or when the pool does not
+        # serve primes of this size
+        with self._condition:
+            stock = self._stocks.get(bits)
+            if stock is None:
+                return None
+            if block:
+                self._condition.wait_for(lambda: stock, timeout)
+            prime = stock.popleft() if stock else None
+            self._refill(bits)
+            return prime
+
+    def _refill(self, bits: int) -> None:
+        if self._executor is None:
+            return
+        available = len(self._stocks[bits]) + self._in_flight[bits]
+        if available >= self.low_water:
+            return
+        for _ in range(self.capacity - available):
+            self._in_flight[bits] += 1
+            future = self._executor.submit(draw_prime, bits)
+            future.add_done_callback(partial(self._on_prime, bits))
+
+    def _on_prime(self, bits: int, future: Future) -> None:
+        with self._condition:
+            self._in_flight[bits] -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._stocks[bits].append(future.result())
+            self._condition.notify_all()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        saved = json.loads(self.path.read_text())
+        _write_json(self.path, {})
+        for size, primes in saved.items():
+            if int(size) in self._stocks:
+                stock = self._stocks[int(size)]
+                stock.extend(int(prime, 16) for prime in primes)
+                while len(stock) > self.capacity:
+                    stock.pop()
+
+    def _save(self) -> None:
+        # The saved primes leave the in-memory stocks
+        if self.path is None:
+            return
+        _write_json(
+            self.path,
+            {
+                str(size): [f"{prime:x}" for prime in stock]
+                for size, stock in self._stocks.items()
+                if stock
+            },
+        )
+        for stock in self._stocks.values():
+            stock.clear()
+
+
+def _write_json(path: Path, data: dict[str, list[str]]) -> None:
+    # mkstemp creates the file readable by its owner only
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(data, tmp)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+# Pool used by rsa_cipher.keygen when none is given
+_default_pool: Optional[PrimePool] = None
+
+
+def get_default_pool() -> Optional[PrimePool]:
+    return _default_pool
+
+
+def set_default_pool(pool: Optional[PrimePool]) -> None:
+    global _default_pool
+    _default_pool = pool
@@ -1,35 +1,204 @@
-import sys
-
+import io
+import os
+import struct
+from collections.abc import (
+    Callable,
+    Iterable,
+    Iterator,
+)
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+from functools import (
+    partial,
+)
 from math import (
     gcd,
 )
+from types import (
+    TracebackType,
+)
+from typing import (
+    IO,
+    Any,
+    NamedTuple,
+    Optional,
+    Union,
+)
 
+from cryptoy.prime_pool import (
+    PrimePool,
+    get_default_pool,
+)
 from cryptoy.utils import (
+    bytes_to_int,
     draw_random_prime,
     int_to_str,
     modular_inverse,
-    pow_mod,
     str_to_int,
 )
 
-sys.setrecursionlimit(5000)
+# Block mode: bytes are cut into blocks of k - 1 bytes, k being the byte length
+# of the modulus, so that every block is smaller than n. The framed stream is
+# a header (BLOCK_MAGIC, BLOCK_VERSION, k) followed by one frame per block: the
+# plaintext length on 2 bytes, then the k bytes of the encrypted block.
+BLOCK_MAGIC = b"CRSA"
+BLOCK_VERSION = 1
+BLOCK_HEADER = struct.Struct(">4sBH")
+FRAME_LENGTH = struct.Struct(">H")
+
+# Number of blocks read, encrypted in parallel and written at once
+BLOCKS_PER_BATCH = 64
+
+# Below this number of blocks in a batch, starting the process pool costs more
+# than it saves and the blocks are handled inline
+PARALLEL_MIN_BLOCKS = 8
+
+
+class CRTKey(NamedTuple):
+    # Private key in Chinese Remainder Theorem form: two half-size
+    # exponentiations modulo p and q replace the full one modulo n
+    p: int
+    q: int
+    dp: int
+    dq: int
+    qinv: int
+
+
+def crt_key(p: int, q: int, d: int) -> CRTKey:
+    return CRTKey(p, q, d % (p - 1), d % (q - 1), modular_inverse(q, p))
+
+
+def crt_pow(msg: int, crt: CRTKey) -> int:
+    # msg ** d % (p * q), recombined with Garner's formula
+    m_p = pow(msg, crt.dp, crt.p)
+    m_q = pow(msg, crt.dq, crt.q)
+    return m_q + (m_p - m_q) * crt.qinv % crt.p * crt.q
+
+
+def modulus_length(n: int) -> int:
+    return (n.bit_length() + 7) // 8
+
+
+class RSAPublicKey:
+    # Public key (e, n) with its byte length computed once
+    __slots__ = ("e", "n", "length")
+
+    def __init__(self, e: int, n: int) -> None:
+        self.e = e
+        self.n = n
+        self.length = modulus_length(n)
+
+    def __repr__(self) -> str:
+        return f"RSAPublicKey({self.e}, {self.n:#x})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RSAPublicKey):
+            return NotImplemented
+        return (self.e, self.n) == (other.e, other.n)
+
+    def __hash__(self) -> int:
+        return hash((self.e, self.n))
+
+    @classmethod
+    def from_tuple(cls, public_key: tuple) -> "RSAPublicKey":
+        e, n = public_key
+        return cls(e, n)
+
+    def to_tuple(self) -> tuple[int, int]:
+        return self.e, self.n
+
+    def encrypt_int(self, m: int) -> int:
+        if not 0 <= m < self.n:
+            raise ValueError("message too long for the modulus, use encrypt_bytes")
+        return pow(m, self.e, self.n)
+
+
+class RSAPrivateKey:
+    # Private exponent with its public key, and the CRT form when p and q are
+    # known (keys from keygen)
+    __slots__ = ("public_key", "d", "crt")
+
+    def __init__(
+        self, public_key: RSAPublicKey, d: int, crt: Optional[CRTKey] = None
+    ) -> None:
+        self.public_key = public_key
+        self.d = d
+        self.crt = crt
+
+    def __repr__(self) -> str:
+        return f"RSAPrivateKey({self.public_key!r}, ...)"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RSAPrivateKey):
+            return NotImplemented
+        return (self.public_key, self.d, self.crt) == (
+            other.public_key,
+            other.d,
+            other.crt,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.public_key, self.d))
 
-def keygen() -> dict:
+    @classmethod
+    def from_dict(cls, key: dict) -> "RSAPrivateKey":
+        crt = key.get("crt")
+        return cls(
+            RSAPublicKey.from_tuple(key["public_key"]),
+            key["private_key"],
+            CRTKey(*crt) if crt is not None else None,
+        )
+
+    def to_dict(self) -> dict:
+        key = {"public_key": self.public_key.to_tuple(), "private_key": self.d}
+        if self.crt is not None:
+            key["crt"] = self.crt
+        return key
+
+    def decrypt_int(self, c: int) -> int:
+        n = self.public_key.n
+        if self.crt is not None:
+            return crt_pow(c % n, self.crt)
+        return pow(c, self.d, n)
+
+
+def as_public_key(public_key: Union[tuple, RSAPublicKey]) -> RSAPublicKey:
+    if isinstance(public_key, RSAPublicKey):
+        return public_key
+    return RSAPublicKey.from_tuple(public_key)
+
+
+def as_private_key(key: Union[dict, RSAPrivateKey]) -> RSAPrivateKey:
+    if isinstance(key, RSAPrivateKey):
+        return key
+    return RSAPrivateKey.from_dict(key)
+
+
+def draw_prime(pool: Optional[PrimePool] = None) -> int:
+    # Prime from the pool when it has one in stock, generated inline otherwise
+    pool = pool if pool is not None else get_default_pool()
+    prime = pool.get(1024) if pool is not None else None
+    return prime if prime is not None else draw_random_prime()
+
+
+def keygen(pool: Optional[PrimePool] = None) -> dict:
     e = 65537
     # Implementez la génération de clef de RSA avec e = 65537
     # 1. Tire aléatoirement un nombre premier p avec la fonction draw_random_prime
     # 2. Tire aléatoirement un nombre premier q avec la fonction draw_random_prime
     # 3. Calcul de d, l'inverse de e modulo (p - 1) * (q - 1), avec la fonction modular_inverse
     # 4. Renvoit un dictionnaire { "public_key": (e, p * q), "private_key": d}
+    # The "crt" entry keeps p and q for the faster decryption, see CRTKey
 
-    p = draw_random_prime()
-    q = draw_random_prime()
+    p = draw_prime(pool)
+    q = draw_prime(pool)
     
        
 
     # vérifie qu'ils sont premiers entre eux
     while gcd(p,q) != 1:
-        q = draw_random_prime()
+        q = draw_prime(pool)
 
     n = p*q
 
@@ -37,27 +206,171 @@ def keygen() -> dict:
     d = pow(e, -1, phi)
 
 
-    return { "public_key": (e, n), "private_key": d}
+    return {"public_key": (e, n), "private_key": d, "crt": crt_key(p, q, d)}
 
 
-def encrypt(msg: str, public_key: tuple) -> int:
+def encrypt(msg: str, public_key: Union[tuple, RSAPublicKey]) -> int:
     # Implementez le chiffrement rsa d'un message avec une clef publique de la forme (e, N)
     # 1. Convertir le message en nombre entier avec la fonction str_to_int
     # 2. Verifiez que ce nombre est < public_key[1], sinon lancer une exception
     # 3. Chiffrez le nombre entier avec pow_mod et les paramètre de la clef publique (e, N)
 
-    e = public_key[0]
-    n = public_key[1]
+    return as_public_key(public_key).encrypt_int(str_to_int(msg))
 
-    return pow(str_to_int(msg), e, n)
 
-
-def decrypt(msg: int, key: dict) -> str:
+def decrypt(msg: int, key: Union[dict, RSAPrivateKey]) -> str:
     # Implementez le dechiffrement rsa d'un message avec une clef de la forme { "public_key": (e, p * q), "private_key": d}
     # 1. Utilisez pow_mod avec les paramètres de la clef
     # 2. Convertir l'entier calculé en str avec la fonction int_to_str
     
-    n = key["public_key"][1]
-    d = key["private_key"]
+    # Keys without the "crt" entry (older dicts) use the full exponentiation
+    return int_to_str(as_private_key(key).decrypt_int(msg))
+
+
+def encrypt_block(block: bytes, public_key: Union[tuple, RSAPublicKey]) -> bytes:
+    # block is at most modulus_length(n) - 1 bytes long
+    public_key = as_public_key(public_key)
+    m = public_key.encrypt_int(bytes_to_int(block))
+    return m.to_bytes(public_key.length, "big")
+
+
+def decrypt_block(frame: tuple[int, bytes], key: Union[dict, RSAPrivateKey]) -> bytes:
+    # frame is (plaintext length, encrypted block)
+    length, block = frame
+    m = as_private_key(key).decrypt_int(bytes_to_int(block))
+    if m.bit_length() > 8 * length:
+        raise ValueError("block does not decrypt to its announced length")
+    return m.to_bytes(length, "big")
+
+
+class _BlockPool:
+    # Process pool started by the first batch of at least PARALLEL_MIN_BLOCKS
+    # blocks, so that short inputs never start it. Never started for
+    # workers == 1.
+
+    def __init__(self, workers: Optional[int]) -> None:
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "_BlockPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def map(
+        self, function: Callable[[Any], bytes], items: list[Any]
+    ) -> Iterable[bytes]:
+        if self.workers == 1 or len(items) < PARALLEL_MIN_BLOCKS:
+            return map(function, items)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        chunksize = max(1, len(items) // (2 * (os.cpu_count() or 1)))
+        return self._executor.map(function, items, chunksize=chunksize)
+
+
+def _read_batches(src: IO[bytes], size: int) -> Iterator[bytes]:
+    # Batches of exactly size bytes, except for the last one
+    while True:
+        data = b""
+        while len(data) < size:
+            chunk = src.read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        if not data:
+            return
+        yield data
+        if len(data) < size:
+            return
+
+
+def encrypt_stream(
+    src: IO[bytes],
+    dst: IO[bytes],
+    public_key: Union[tuple, RSAPublicKey],
+    workers: Optional[int] = None,
+) -> int:
+    # Encrypts src into dst as a framed block stream, returns the number of
+    # plaintext bytes. Only BLOCKS_PER_BATCH blocks are held in memory.
+    public_key = as_public_key(public_key)
+    k = public_key.length
+    if k < 2:
+        raise ValueError("modulus too small for block mode")
+    encrypt = partial(encrypt_block, public_key=public_key)
+    dst.write(BLOCK_HEADER.pack(BLOCK_MAGIC, BLOCK_VERSION, k))
+    total = 0
+    with _BlockPool(workers) as pool:
+        for data in _read_batches(src, BLOCKS_PER_BATCH * (k - 1)):
+            blocks = [data[i : i + k - 1] for i in range(0, len(data), k - 1)]
+            encrypted_blocks = pool.map(encrypt, blocks)
+            for block, encrypted in zip(blocks, encrypted_blocks):
+                dst.write(FRAME_LENGTH.pack(len(block)))
+                dst.write(encrypted)
+            total += len(data)
+    return total
+
+
+def decrypt_stream(
+    src: IO[bytes],
+    dst: IO[bytes],
+    key: Union[dict, RSAPrivateKey],
+    workers: Optional[int] = None,
+) -> int:
+    # Decrypts a stream written by encrypt_stream, returns the number of
+    # plaintext bytes
+    header = src.read(BLOCK_HEADER.size)
+    if len(header) < BLOCK_HEADER.size:
+        raise ValueError("truncated block stream header")
+    magic, version, k = BLOCK_HEADER.unpack(header)
+    if magic != BLOCK_MAGIC:
+        raise ValueError("not an RSA block stream")
+    if version != BLOCK_VERSION:
+        raise ValueError(f"unsupported block stream version {version}")
+    key = as_private_key(key)
+    if k != key.public_key.length:
+        raise ValueError("block stream encrypted for another modulus")
+
+    decrypt = partial(decrypt_block, key=key)
+    frame_size = FRAME_LENGTH.size + k
+    total = 0
+    with _BlockPool(workers) as pool:
+        for data in _read_batches(src, BLOCKS_PER_BATCH * frame_size):
+            if len(data) % frame_size:
+                raise ValueError("truncated block stream")
+            frames = []
+            for i in range(0, len(data), frame_size):
+                (length,) = FRAME_LENGTH.unpack_from(data, i)
+                if length > k - 1:
+                    raise ValueError("invalid block length")
+                frames.append((length, data[i + FRAME_LENGTH.size : i + frame_size]))
+            for block in pool.map(decrypt, frames):
+                dst.write(block)
+                total += len(block)
+    return total
+
+
+def encrypt_bytes(
+    data: Union[bytes, bytearray],
+    public_key: Union[tuple, RSAPublicKey],
+    workers: Optional[int] = None,
+) -> bytes:
+    dst = io.BytesIO()
+    encrypt_stream(io.BytesIO(data), dst, public_key, workers)
+    return dst.getvalue()
+
 
-    return int_to_str(pow(msg, d, n))
+def decrypt_bytes(
+    data: Union[bytes, bytearray],
+    key: Union[dict, RSAPrivateKey],
+    workers: Optional[int] = None,
+) -> bytes:
+    dst = io.BytesIO()
+    decrypt_stream(io.BytesIO(data), dst, key, workers)
+    return dst.getvalue()
@@ -0,0 +1,264 @@
+import multiprocessing
+import os
+import re
+import time
+from collections.abc import (
+    Callable,
+    Iterator,
+    Sequence,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from typing import (
+    Any,
+    NamedTuple,
+    Optional,
+    Union,
+    overload,
+)
+
+from cryptoy import (
+    caesar_cipher,
+)
+from cryptoy.affine_cipher import (
+    affine_key_inverse,
+    affine_key_space,
+    decrypt_optimized,
+)
+from cryptoy.utils import (
+    score_text,
+)
+
+# Multi-core brute force over a key space: the space is split into shards of
+# consecutive key indices, searched on a process pool, and the hits are
+# yielded as the shards complete. With stop_on_first, the first hit sets a
+# shared event that every worker polls, and pending shards are cancelled.
+
+# Number of keys tested between two polls of the stop event
+POLL_INTERVAL = 256
+
+
+class SearchHit(NamedTuple):
+    key: Any
+    plaintext: str
+
+
+class WorkerStats(NamedTuple):
+    pid: int
+    keys: int
+    seconds: float
+
+    @property
+    def keys_per_second(self) -> float:
+        return self.keys / self.seconds if self.seconds else 0.0
+
+
+class SearchReport:
+    # Filled by search() while it runs: keys tested and time spent per worker
+    def __init__(self) -> None:
+        self.workers: dict[int, WorkerStats] = {}
+        self.elapsed = 0.0
+
+    @property
+    def keys(self) -> int:
+        return sum(stats.keys for stats in self.workers.values())
+
+    @property
+    def keys_per_second(self) -> float:
+        return self.keys / self.elapsed if self.elapsed else 0.0
+
+    def add(self, stats: WorkerStats) -> None:
+        previous = self.workers.get(stats.pid, WorkerStats(stats.pid, 0, 0.0))
+        self.workers[stats.pid] = WorkerStats(
+            stats.pid, previous.keys + stats.keys, previous.seconds + stats.seconds
+        )
+
+
+class CribPredicate:
+    def __init__(self, crib: str) -> None:
+        self.crib = crib
+
+    def __call__(self, plaintext: str) -> bool:
+        return self.crib in plaintext
+
+
+class RegexPredicate:
+    def __init__(self, pattern: Union[str, re.Pattern]) -> None:
+        self.pattern = re.compile(pattern)
+
+    def __call__(self, plaintext: str) -> bool:
+        return self.pattern.search(plaintext) is not None
+
+
+class ScorePredicate:
+    # Accepts plaintexts that look like natural language, see utils.score_text
+    def __init__(self, threshold: float = 0.05) -> None:
+        self.threshold = threshold
+
+    def __call__(self, plaintext: str) -> bool:
+        return score_text(plaintext) >= self.threshold
+
+
+class AffineKeyPairs(Sequence[tuple[int, int]]):
+    # Every affine key (a, b) modulo n, indexed as a_index * n + b
+    def __init__(self, n: int = 0x110000) -> None:
+        self.n = n
+        self.keys = affine_key_space(n)
+
+    def __len__(self) -> int:
+        return len(self.keys) * self.n
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[int, int]:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[int, int]]:
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[tuple[int, int], list[tuple[int, int]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        a_index, b = divmod(index, self.n)
+        return self.keys[a_index], b
+
+
+def decrypt_affine_pair(msg: str, key: tuple[int, int]) -> str:
+    a, b = key
+    return decrypt_optimized(msg, affine_key_inverse(a, 0x110000), b)
+
+
+_stop_event: Any = None
+
+
+def _init_worker(stop_event: Any) -> None:  # noqa: ANN401 typing.Any disallowed
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _search_shard(
+    ciphertext: str,
+    decrypt: Callable[[str, Any], str],
+    keys: Sequence[Any],
+    predicate: Callable[[str], bool],
+) -> tuple[list[SearchHit], WorkerStats]:
+    # keys are the keys of the shard only
+    hits = []
+    begin = time.perf_counter()
+    index = 0
+    for index, key in enumerate(keys):
+        if index % POLL_INTERVAL == 0 and _stop_event.is_set():
+            break
+        plaintext = decrypt(ciphertext, key)
+        if predicate(plaintext):
+            hits.append(SearchHit(key, plaintext))
+    else:
+        index = len(keys)
+    stats = WorkerStats(os.getpid(), index, time.perf_counter() - begin)
+    return hits, stats
+
+
+def search(
+    ciphertext: str,
+    decrypt: Callable[[str, Any], str],
+    keys: Sequence[Any],
+    predicate: Callable[[str], bool],
+    workers: Optional[int] = None,
+    shard_size: int = 4096,
+    stop_on_first: bool = True,
+    report: Optional[SearchReport] = None,
+) -> Iterator[SearchHit]:
+    # decrypt, keys and predicate are sent to the worker processes, so they
+    # must be picklable (module level functions, the predicates above, ...).
+    # Each shard only carries its slice of keys: a range or AffineKeyPairs
+    # slice is cheap, and a list is pickled once in total rather than once per
+    # shard.
+    workers = workers or os.cpu_count() or 1
+    report = report if report is not None else SearchReport()
+    begin = time.perf_counter()
+    stop_event = multiprocessing.Event()
+    shards = iter(range(0, len(keys), shard_size))
+    pending: set[Future] = set()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(stop_event,)
+    ) as executor:
+        try:
+            while True:
+                # Shards are submitted lazily: the key space can be huge
+                for start in shards:
+                    pending.add(
+                        executor.submit(
+                            _search_shard,
+                            ciphertext,
+                            decrypt,
+                            keys[start : start + shard_size],
+                            predicate,
+                        )
+                    )
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    hits, stats = future.result()
+                    report.add(stats)
+                    yield from hits
+                    if hits and stop_on_first:
+                        return
+        finally:
+            # Also reached when the caller stops iterating early. The shards
+            # already running see the event and return what they tested.
+            stop_event.set()
+            for future in pending:
+                future.cancel()
+            for future in wait(pending).done:
+                if not future.cancelled() and future.exception() is None:
+                    report.add(future.result()[1])
+            report.elapsed = time.perf_counter() - begin
+
+
+def search_caesar(
+    ciphertext: str,
+    predicate: Callable[[str], bool],
+    workers: Optional[int] = None,
+    stop_on_first: bool = True,
+    report: Optional[SearchReport] = None,
+) -> Iterator[SearchHit]:
+    return search(
+        ciphertext,
+        caesar_cipher.decrypt,
+        range(0x110000),
+        predicate,
+        workers=workers,
+        stop_on_first=stop_on_first,
+        report=report,
+    )
+
+
+def search_affine(
+    ciphertext: str,
+    predicate: Callable[[str], bool],
+    workers: Optional[int] = None,
+    stop_on_first: bool = True,
+    report: Optional[SearchReport] = None,
+) -> Iterator[SearchHit]:
+    return search(
+        ciphertext,
+        decrypt_affine_pair,
+        AffineKeyPairs(),
+        predicate,
+        workers=workers,
+        stop_on_first=stop_on_first,
+        report=report,
+    )
@@ -1,8 +1,74 @@
+import codecs
+import io
 import random
+from collections.abc import (
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from contextlib import (
+    contextmanager,
+)
 from math import (
     ceil,
+    gcd,
+)
+from typing import (
+    IO,
+    Any,
+    Union,
+)
+
+from cryptoy.primality import (
+    DETERMINISTIC_LIMIT,
+    deterministic_bases,
+    strong_probable_prime,
 )
 
+# Approximate frequencies of the most common characters in French and English
+# text, used to score candidate plaintexts
+CHARACTER_FREQUENCIES = {
+    " ": 0.180,
+    "e": 0.110,
+    "a": 0.065,
+    "s": 0.060,
+    "t": 0.060,
+    "i": 0.058,
+    "n": 0.058,
+    "r": 0.055,
+    "o": 0.055,
+    "u": 0.045,
+    "l": 0.042,
+    "d": 0.035,
+    "c": 0.030,
+    "h": 0.030,
+    "m": 0.026,
+    "p": 0.024,
+    "v": 0.013,
+    "g": 0.012,
+    "f": 0.012,
+    "b": 0.010,
+    "q": 0.008,
+    "y": 0.008,
+    "w": 0.006,
+    "x": 0.004,
+    "j": 0.004,
+    "k": 0.003,
+    "z": 0.002,
+    ",": 0.010,
+    ".": 0.010,
+    "'": 0.005,
+}
+
+
+def score_text(s: str) -> float:
+    # Average frequency of the characters of s, around 0.07 for French or
+    # English text and close to 0 for random codepoints
+    if not s:
+        return 0.0
+    return sum(CHARACTER_FREQUENCIES.get(char.lower(), 0.0) for char in s) / len(s)
+
 
 def str_to_unicodes(s: str) -> list[int]:
     return [ord(char) for char in s]
@@ -12,6 +78,63 @@ def unicodes_to_str(codes: list[int]) -> str:
     return "".join([chr(code) for code in codes])
 
 
+# Characters (text streams) or bytes (binary streams) read at once
+STREAM_CHUNK_SIZE = 1 << 16
+
+
+@contextmanager
+def _surrogatepass(stream: IO[Any]) -> Iterator[None]:
+    # Files opened in text mode use strict errors by default, which reject the
+    # lone surrogates the ciphers can produce: the stream is switched to
+    # surrogatepass meanwhile. A text stream can only be reconfigured once the
+    # text it has already decoded is dropped, which seek(tell()) does without
+    # moving. Non-seekable streams keep surrogatepass afterwards.
+    if not isinstance(stream, io.TextIOWrapper) or stream.errors == "surrogatepass":
+        yield
+        return
+    errors = stream.errors
+    if stream.seekable():
+        stream.seek(stream.tell())
+    stream.reconfigure(errors="surrogatepass")
+    try:
+        yield
+    finally:
+        if stream.seekable() and not stream.closed:
+            stream.seek(stream.tell())
+            stream.reconfigure(errors=errors)
+
+
+def read_text_chunks(
+    src: IO[Any], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[str]:
+    # Text is read from binary streams as UTF-8: a sequence split between two
+    # reads is only decoded once complete. surrogatepass lets lone surrogates,
+    # which the ciphers can produce, round trip through files.
+    decoder = codecs.getincrementaldecoder("utf-8")("surrogatepass")
+    with _surrogatepass(src):
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            text = chunk if isinstance(chunk, str) else decoder.decode(chunk)
+            if text:
+                yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def write_text_chunks(dst: IO[Any], chunks: Iterable[str]) -> int:
+    # Returns the number of characters written
+    binary = not isinstance(dst, io.TextIOBase)
+    count = 0
+    with _surrogatepass(dst):
+        for chunk in chunks:
+            dst.write(chunk.encode("utf-8", "surrogatepass") if binary else chunk)
+            count += len(chunk)
+    return count
+
+
 def bytes_to_binary_strings(bytes_: bytes) -> list[str]:
     return [f"{b:08b}" for b in bytes_]
 
@@ -29,7 +152,17 @@ def str_to_binary(s: str) -> str:
 
 
 def str_to_int(s: str) -> int:
-    return int(str_to_binary(s), 2)
+    # Same result as int(str_to_binary(s), 2), without the binary strings
+    return bytes_to_int(s.encode())
+
+
+def bytes_to_int(bytes_: Union[bytes, bytearray, memoryview]) -> int:
+    return int.from_bytes(bytes_, "big")
+
+
+def int_to_bytes(value: int) -> bytes:
+    # Shortest big-endian encoding, with at least one byte like int_to_binary
+    return value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big")
 
 
 def split_binary_strings(s: str) -> list[str]:
@@ -51,23 +184,118 @@ def int_to_binary(value: int) -> str:
 
 
 def int_to_str(value: int) -> str:
-    return bytes_to_str(
-        binary_strings_to_bytes(split_binary_strings(int_to_binary(value)))
-    )
+    # Same result as going through int_to_binary, split_binary_strings and
+    # binary_strings_to_bytes
+    return bytes_to_str(int_to_bytes(value))
+
+
+def exponent_window(bits: int) -> int:
+    # Window size minimizing the multiplications for exponents of this size
+    for threshold, window in ((671, 6), (239, 5), (79, 4), (23, 3)):
+        if bits > threshold:
+            return window
+    return 1
+
+
+def sliding_window_digits(e: int, window: int) -> list[tuple[int, int]]:
+    # Splits e, from its most significant bit, into (squarings, digit) steps:
+    # square the result squarings times, then multiply it by b ** digit. The
+    # digits are odd and below 2 ** window, or 0 for no multiplication.
+    bits = f"{e:b}"
+    steps = []
+    i = 0
+    while i < len(bits):
+        if bits[i] == "0":
+            steps.append((1, 0))
+            i += 1
+            continue
+        j = min(i + window, len(bits))
+        while bits[j - 1] == "0":
+            j -= 1
+        steps.append((j - i, int(bits[i:j], 2)))
+        i = j
+    return steps
+
+
+def odd_powers(b: int, window: int, mul: Callable[[int, int], int]) -> list[int]:
+    # [b, b ** 3, b ** 5, ..., b ** (2 ** window - 1)] using mul
+    powers = [b]
+    b2 = mul(b, b)
+    for _ in range(2 ** (window - 1) - 1):
+        powers.append(mul(powers[-1], b2))
+    return powers
 
 
 # Fast modular exponent: (b ** e) % m
 def pow_mod(b: int, e: int, m: int) -> int:
+    if e < 0:
+        raise ValueError("negative exponent")
     if e == 0:
         return 1
-    elif e == 1:
-        return b % m
-    else:
-        root = pow_mod(b, e // 2, m)
-        if e % 2 == 0:
-            return (root * root) % m
-        else:
-            return (root * root * b) % m
+
+    window = exponent_window(e.bit_length())
+    powers = odd_powers(b % m, window, lambda x, y: x * y % m)
+    result = 1
+    for squarings, digit in sliding_window_digits(e, window):
+        for _ in range(squarings):
+            result = result * result % m
+        if digit:
+            result = result * powers[digit >> 1] % m
+    return result % m
+
+
+class ModContext:
+    # Montgomery arithmetic modulo an odd m, with R = 2 ** m.bit_length().
+    # The constants are computed once, so every exponentiation under the same
+    # modulus reuses them: numbers are converted to the Montgomery form x * R % m
+    # where a product only needs multiplications, masks and shifts (redc)
+    # instead of a division by m.
+
+    def __init__(self, m: int) -> None:
+        if m <= 1 or m % 2 == 0:
+            raise ValueError("Montgomery arithmetic needs an odd modulus > 1")
+        self.m = m
+        self.bits = m.bit_length()
+        self.mask = (1 << self.bits) - 1
+        # m * m_prime == -1 mod R
+        self.m_prime = -modular_inverse(m, 1 << self.bits) & self.mask
+        self.r2 = (1 << (2 * self.bits)) % m
+        self.one = (1 << self.bits) % m
+
+    def __repr__(self) -> str:
+        return f"ModContext({self.m})"
+
+    def redc(self, t: int) -> int:
+        # t * R ** -1 % m, for 0 <= t < m * R
+        u = (t & self.mask) * self.m_prime & self.mask
+        t = (t + u * self.m) >> self.bits
+        return t - self.m if t >= self.m else t
+
+    def to_montgomery(self, x: int) -> int:
+        return self.redc(x % self.m * self.r2)
+
+    def from_montgomery(self, x: int) -> int:
+        return self.redc(x)
+
+    def mul(self, x: int, y: int) -> int:
+        # Product of two numbers in Montgomery form
+        return self.redc(x * y)
+
+    def pow(self, b: int, e: int) -> int:
+        # (b ** e) % m, with b and the result in the usual form
+        if e < 0:
+            raise ValueError("negative exponent")
+
+        window = exponent_window(e.bit_length())
+        powers = odd_powers(self.to_montgomery(b), window, self.mul)
+        redc = self.redc
+        result = self.one
+        for squarings, digit in sliding_window_digits(e, window):
+            for _ in range(squarings):
+                result = redc(result * result)
+            if digit:
+                result = redc(result * powers[digit >> 1])
+        return self.from_montgomery(result)
 
 
 def miller_rabin(n: int, k: int) -> bool:
@@ -80,9 +308,15 @@ def miller_rabin(n: int, k: int) -> bool:
     if n == 2 or n == 3:
         return True
 
-    if n % 2 == 0:
+    if n < 2 or n % 2 == 0:
         return False
 
+    # Below DETERMINISTIC_LIMIT, a fixed set of bases gives an exact answer
+    if n < DETERMINISTIC_LIMIT:
+        return all(
+            strong_probable_prime(n, a % n) for a in deterministic_bases(n) if a % n
+        )
+
     r, s = 0, n - 1
     while s % 2 == 0:
         r += 1
@@ -101,18 +335,99 @@ def miller_rabin(n: int, k: int) -> bool:
     return True
 
 
+def sieve_primes(limit: int) -> list[int]:
+    # Primes below limit, by the sieve of Eratosthenes
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for p in range(2, int(limit**0.5) + 1):
+        if sieve[p]:
+            sieve[p * p :: p] = bytes(len(range(p * p, limit, p)))
+    return [p for p, is_prime in enumerate(sieve) if is_prime]
+
+
+SMALL_PRIMES = sieve_primes(20000)
+
+# Odd candidates tested at once by prime_candidates
+SIEVE_WINDOW = 4096
+
+
+def miller_rabin_rounds(bits: int) -> int:
+    # Rounds needed for an error probability below 2 ** -128 on random
+    # candidates of this size (same table as OpenSSL)
+    for threshold, rounds in (
+        (3747, 3),
+        (1345, 4),
+        (476, 5),
+        (400, 6),
+        (347, 7),
+        (308, 8),
+        (55, 27),
+    ):
+        if bits >= threshold:
+            return rounds
+    return 34
+
+
+def prime_candidates(min: int, max: int) -> Iterator[int]:
+    # Odd numbers of [min, max) without small prime factors, in increasing
+    # order from a random start. Each window of SIEVE_WINDOW odd numbers is
+    # sieved with slice assignments: candidate start + 2 * k is a multiple of
+    # p when k == -start / 2 mod p, and these residues are updated from one
+    # window to the next instead of recomputed.
+    while True:
+        start = random.randrange(min, max) | 1
+        # p can only be sieved once start > p * p, else p itself is removed
+        primes = [p for p in SMALL_PRIMES[1:] if p * p < start]
+        halves = [(p + 1) // 2 for p in primes]  # inverse of 2 modulo p
+        residues = [start % p for p in primes]
+
+        while start < max:
+            sieve = bytearray([1]) * SIEVE_WINDOW
+            for i, p in enumerate(primes):
+                k = -residues[i] * halves[i] % p
+                if k < SIEVE_WINDOW:
+                    sieve[k::p] = bytes(len(range(k, SIEVE_WINDOW, p)))
+                residues[i] = (residues[i] + 2 * SIEVE_WINDOW) % p
+            for k in range(SIEVE_WINDOW):
+                if sieve[k] and start + 2 * k < max:
+                    yield start + 2 * k
+            start += 2 * SIEVE_WINDOW
+
+
 def draw_random_prime(
     min: int = 2**1023, max: int = 2**1024
 ) -> (
     int
 ):  # source for RSA prime lengths: https://crypto.stackexchange.com/questions/22971/what-prime-lengths-are-used-for-rsa
-    while True:
-        p = (2 * random.randint(min, max) + 1) % max
-        fermat_test = pow_mod(2, p - 1, p)
-        if fermat_test != 1:
-            continue
-        if miller_rabin(p, 40):
-            return p
+    # Random odd prime of [min, max): sieved candidates go through a cheap
+    # base 2 Fermat test first, then through Miller-Rabin
+    return next(
+        p
+        for p in prime_candidates(min, max)
+        if pow_mod(2, p - 1, p) == 1
+        and miller_rabin(p, miller_rabin_rounds(p.bit_length()))
+    )
+
+
+def prime_factors(n: int) -> dict[int, int]:
+    # Factorization of n by trial division, as a {prime: exponent} dict
+    factors: dict[int, int] = {}
+    d = 2
+    while d * d <= n:
+        while n % d == 0:
+            factors[d] = factors.get(d, 0) + 1
+            n //= d
+        d += 1 if d == 2 else 2
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+    return factors
+
+
+def euler_totient(n: int) -> int:
+    result = n
+    for p in prime_factors(n):
+        result -= result // p
+    return result
 
 
 def modular_inverse(a: int, n: int) -> int:
@@ -132,3 +447,34 @@ def modular_inverse(a: int, n: int) -> int:
         t = t + n
 
     return t
+
+
+def solve_linear_congruence(a: int, c: int, n: int) -> list[int]:
+    # All the x in [0, n) such that a * x % n == c % n
+    g = gcd(a, n)
+    if c % g != 0:
+        return []
+    m = n // g
+    x = (c // g) * modular_inverse((a // g) % m, m) % m if m > 1 else 0
+    return [x + k * m for k in range(g)]
+
+
+def batch_modular_inverse(values: Sequence[int], n: int) -> list[int]:
+    # Montgomery's trick: a single modular_inverse for the product of all the
+    # values, then each inverse is recovered with two multiplications
+    if not values:
+        return []
+
+    prefix_products = []
+    product = 1
+    for value in values:
+        product = product * value % n
+        prefix_products.append(product)
+
+    inverse = modular_inverse(product, n)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = inverse * prefix_products[i - 1] % n
+        inverse = inverse * values[i] % n
+    inverses[0] = inverse
+    return inverses
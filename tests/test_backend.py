@@ -0,0 +1,55 @@
+import pytest
+
+from cryptoy import (
+    backend,
+    caesar_cipher,
+)
+
+MSG = "C@€s4r Ciph€r \ud800 \U0010ffff " * 64
+
+
+@pytest.mark.parametrize("name", backend.available_backends())
+def test_affine_map(name: str) -> None:
+    expected = "".join(chr((13 * ord(c) + 4321) % 0x110000) for c in MSG)
+    assert backend.affine_map(MSG, 13, 4321, backend=name) == expected
+    assert backend.affine_map(MSG, 1, -0x110001, backend=name) == "".join(
+        chr((ord(c) - 1) % 0x110000) for c in MSG
+    )
+    assert backend.affine_map("", 13, 4321, backend=name) == ""
+
+
+@pytest.mark.parametrize("name", backend.available_backends())
+def test_affine_map_many(name: str) -> None:
+    msgs = ["Hello", "", MSG, "€"]
+    assert backend.affine_map_many(msgs, 13, 4321, backend=name) == [
+        backend.affine_map(msg, 13, 4321, backend="python") for msg in msgs
+    ]
+    assert backend.affine_map_many([], 13, 4321, backend=name) == []
+
+
+@pytest.mark.parametrize("name", backend.available_backends())
+def test_affine_map_under_keys(name: str) -> None:
+    keys = [(1, 0), (13, 4321), (0x10FFFF, -1), (3, 0x110000 * 5)]
+    assert backend.affine_map_under_keys(MSG, keys, backend=name) == [
+        backend.affine_map(MSG, a, b, backend="python") for a, b in keys
+    ]
+    assert backend.affine_map_under_keys("", keys, backend=name) == [""] * 4
+    assert backend.affine_map_under_keys(MSG, [], backend=name) == []
+
+
+def test_numpy_backend_matches_python() -> None:
+    pytest.importorskip("numpy")
+    encrypted = backend.affine_map(MSG, 0x10FFFF, 1234, backend="numpy")
+    assert encrypted == backend.affine_map(MSG, 0x10FFFF, 1234, backend="python")
+
+
+def test_set_backend() -> None:
+    previous = backend.get_backend()
+    try:
+        backend.set_backend("python")
+        assert backend.resolve_backend(10**6) == "python"
+        assert caesar_cipher.decrypt(caesar_cipher.encrypt(MSG, 4321), 4321) == MSG
+        with pytest.raises(ValueError, match="unknown backend"):
+            backend.set_backend("cuda")
+    finally:
+        backend.set_backend(previous)
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from cryptoy import (
+    dh_groups,
+)
+from cryptoy.diffie_hellman import (
+    DHGroup,
+)
+
+
+def test_named_groups() -> None:
+    assert len(dh_groups.group_names()) == 13
+    for name in dh_groups.group_names():
+        group = dh_groups.get_named_group(name)
+        assert group.prime_number.bit_length() == int(name.strip("modpfhe"))
+        assert group.prime_number == 2 * group.subgroup_order + 1
+    assert dh_groups.get_named_group("modp768").verify()
+    assert f"{dh_groups.get_named_group('modp2048').prime_number:x}".startswith(
+        "ffffffffffffffffc90fdaa22168c234c4c6628b80dc1cd1"
+    )
+    assert f"{dh_groups.get_named_group('ffdhe2048').prime_number:x}".startswith(
+        "ffffffffffffffffadf85458a2bb4a9aafdc5620273d3cf1"
+    )
+    with pytest.raises(ValueError):
+        dh_groups.get_named_group("modp1")
+
+
+def test_named_group_keygen() -> None:
+    group = dh_groups.NamedGroup(
+        "modp768", dh_groups.get_named_group("modp768").prime_number, 2
+    )
+    alice = group.keygen()
+    bob = group.keygen(short_exponent=True)
+    assert group.table() is group.table()
+    assert group.table().built and group.table(True).built
+
+    assert group.validate_public_key(alice["public_key"])
+    assert group.validate_public_key(bob["public_key"])
+    assert group.compute_shared_secret_key(
+        alice["public_key"], bob["private_key"]
+    ) == group.compute_shared_secret_key(bob["public_key"], alice["private_key"])
+    for invalid in [0, 1, group.prime_number - 1, group.prime_number]:
+        assert not group.validate_public_key(invalid)
+    with pytest.raises(ValueError):
+        group.compute_shared_secret_key(1, alice["private_key"])
+
+
+def test_named_group_threads() -> None:
+    group = dh_groups.NamedGroup(
+        "modp768", dh_groups.get_named_group("modp768").prime_number, 2
+    )
+    tables: list[DHGroup] = []
+    threads = [
+        threading.Thread(target=lambda: tables.append(group.table())) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(tables) == 8 and all(table is tables[0] for table in tables)
+
+
+def test_named_group_cache(tmp_path: Path) -> None:
+    prime_number = dh_groups.get_named_group("modp768").prime_number
+    dh_groups.set_cache_dir(tmp_path)
+    try:
+        built = dh_groups.NamedGroup("modp768", prime_number, 2).table()
+        assert len(list(tmp_path.glob("modp768-*.dht"))) == 1
+
+        loaded = dh_groups.NamedGroup("modp768", prime_number, 2).table()
+        assert loaded is not built
+        assert loaded.build() == built.build()
+
+        # A stale file is rebuilt
+        path = next(tmp_path.glob("modp768-*.dht"))
+        path.write_bytes(path.read_bytes()[:-1])
+        rebuilt = dh_groups.NamedGroup("modp768", prime_number, 2).table()
+        assert rebuilt.build() == built.build()
+        assert dh_groups.read_table(path, rebuilt) is not None
+
+        # So is a damaged one, whether or not its digest was updated
+        header_size = dh_groups.TABLE_HEADER.size
+        rows_offset = header_size + 2 * 96
+        data = bytearray(path.read_bytes())
+        data[rows_offset + 95] ^= 1
+        path.write_bytes(data)
+        assert dh_groups.read_table(path, rebuilt) is None
+        digest = hashlib.sha256(data[rows_offset:]).digest()
+        data[header_size - len(digest) : header_size] = digest
+        path.write_bytes(data)
+        assert dh_groups.read_table(path, rebuilt) is None
+        rebuilt = dh_groups.NamedGroup("modp768", prime_number, 2).table()
+        assert rebuilt.build() == built.build()
+    finally:
+        dh_groups.set_cache_dir(None)
@@ -0,0 +1,44 @@
+import pytest
+
+from cryptoy import (
+    envelope,
+    rsa_cipher,
+)
+
+
+def test_envelope() -> None:
+    key = rsa_cipher.keygen()
+    for msg in [b"", b"Hello World", bytes(range(256)) * 4096]:
+        sealed = envelope.encrypt(msg, key["public_key"])
+        assert sealed.startswith(envelope.ENVELOPE_MAGIC)
+        assert len(sealed) < len(msg) + 300
+        assert envelope.decrypt(sealed, key) == msg
+
+    legacy_key = {"public_key": key["public_key"], "private_key": key["private_key"]}
+    assert envelope.decrypt(sealed, legacy_key) == msg
+
+
+def test_wrap_key_is_randomized() -> None:
+    key = rsa_cipher.keygen()
+    aes_key = bytes(envelope.AES_KEY_SIZE)
+    first = envelope.wrap_key(aes_key, key["public_key"])
+    second = envelope.wrap_key(aes_key, key["public_key"])
+    assert first != second
+    assert envelope.unwrap_key(first, key) == envelope.unwrap_key(second, key)
+    assert envelope.unwrap_key(first, key) == aes_key
+
+
+def test_envelope_errors() -> None:
+    key = rsa_cipher.keygen()
+    sealed = envelope.encrypt(b"Hello World", key["public_key"])
+
+    with pytest.raises(RuntimeError):
+        envelope.decrypt(sealed, rsa_cipher.keygen())
+    tampered = bytearray(sealed)
+    tampered[-1] ^= 1
+    with pytest.raises(RuntimeError):
+        envelope.decrypt(tampered, key)
+    with pytest.raises(ValueError):
+        envelope.decrypt(b"XXXX" + sealed[4:], key)
+    with pytest.raises(ValueError):
+        envelope.decrypt(sealed[:20], key)
@@ -0,0 +1,71 @@
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from cryptoy import (
+    rsa_cipher,
+)
+from cryptoy.keyring import (
+    Key,
+    Keyring,
+    decode_key,
+    encode_key,
+    load_keys,
+    save_keys,
+)
+
+
+def test_keyring(tmp_path: Path) -> None:
+    key = rsa_cipher.keygen()
+    private_key = rsa_cipher.RSAPrivateKey.from_dict(key)
+    legacy_key = rsa_cipher.RSAPrivateKey.from_dict(
+        {"public_key": key["public_key"], "private_key": key["private_key"]}
+    )
+    keys: list[Key] = [
+        private_key,
+        private_key.public_key,
+        legacy_key,
+        rsa_cipher.RSAPublicKey(3, 55),
+    ]
+
+    path = tmp_path / "keys.bin"
+    assert save_keys(path, keys) == 4
+    assert path.stat().st_mode & 0o077 == 0
+    assert load_keys(path) == keys
+    with Keyring(path) as keyring:
+        assert len(keyring) == 4
+        assert keyring[-1] == keys[-1]
+        assert keyring[1:3] == keys[1:3]
+        first = keyring[0]
+        assert isinstance(first, rsa_cipher.RSAPrivateKey)
+        assert first.crt == key["crt"]
+        with pytest.raises(IndexError):
+            keyring[4]
+
+    assert save_keys(path, []) == 0
+    assert load_keys(path) == []
+
+
+def test_keyring_errors(tmp_path: Path) -> None:
+    path = tmp_path / "keys.bin"
+    save_keys(path, [rsa_cipher.RSAPublicKey(3, 55)])
+    data = path.read_bytes()
+
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        Keyring(path)
+    path.write_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        Keyring(path)
+
+    record = encode_key(rsa_cipher.RSAPublicKey(3, 55))
+    assert decode_key(record) == rsa_cipher.RSAPublicKey(3, 55)
+    with pytest.raises(ValueError):
+        decode_key(record[:-1])
+    # Cut in the length field of the second integer
+    with pytest.raises(ValueError):
+        decode_key(record[:7])
+    with pytest.raises(ValueError):
+        decode_key(b"\x09" + record[1:])
@@ -0,0 +1,151 @@
+import hashlib
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from cryptoy import (
+    password_audit,
+    passwords,
+)
+
+
+def test_wordlist_shards(tmp_path: Path) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    words = [f"word{i}" * (i % 7) for i in range(1000)]
+    wordlist.write_bytes("\r\n".join(words).encode())
+
+    for shard_size in [1, 5, 64, 10**6]:
+        shards = password_audit.wordlist_shards(wordlist, shard_size)
+        lines = [
+            line.decode()
+            for start, end in shards
+            for line in password_audit.iter_shard_lines(wordlist, start, end)
+        ]
+        assert lines == words
+
+
+def test_audit(tmp_path: Path) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    words = [f"password{i}" for i in range(5000)] + ["€uro", "password3"]
+    wordlist.write_bytes(b"\xff\xfe\n" + "\n".join(words).encode())
+    passwords_database = {
+        "Alice": passwords.hash_password("password3"),
+        "Bob": passwords.hash_password("€uro"),
+        "Carol": passwords.hash_password("password4999"),
+        "Dave": passwords.hash_password("password3"),
+        "Eve": passwords.hash_password("not in the list"),
+    }
+    expected = passwords.attack(words, passwords_database)
+    assert len(expected) == 4
+
+    for workers in [1, 2]:
+        report = password_audit.AuditReport()
+        found = password_audit.audit(
+            wordlist, passwords_database, workers, shard_size=1000, report=report
+        )
+        assert found == expected
+        assert report.words == len(words) + 1
+        assert report.hashes_per_second > 0
+
+
+def test_audit_salted(tmp_path: Path) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    words = [f"password{i}" for i in range(3000)] + ["€uro"]
+    wordlist.write_text("\n".join(words))
+    users_and_passwords = {
+        "Alice": "password3",
+        "Bob": "€uro",
+        "Carol": "password2999",
+        "Dave": "password3",
+        "Eve": "not in the list",
+    }
+    new_database = passwords.fix(
+        list(users_and_passwords.values()),
+        {user: passwords.hash_password(p) for user, p in users_and_passwords.items()},
+    )
+    expected = {user: p for user, p in users_and_passwords.items() if user != "Eve"}
+
+    for workers in [1, 2]:
+        report = password_audit.AuditReport()
+        assert (
+            password_audit.audit_salted(
+                wordlist, new_database, workers, shard_size=4096, report=report
+            )
+            == expected
+        )
+        # Alice and Dave stop in the first shard, the others read every shard
+        assert 3 * len(words) <= report.words < 4 * len(words)
+
+
+def test_audit_salted_checkpoint(tmp_path: Path) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    words = [f"password{i}" for i in range(3000)]
+    wordlist.write_text("\n".join(words))
+    salt = passwords.random_salt()
+    new_database = {
+        "Alice": {
+            "password_hash": passwords.hash_password(salt + "password2500"),
+            "password_salt": salt,
+        },
+        "Eve": {
+            "password_hash": passwords.hash_password(salt + "not in the list"),
+            "password_salt": salt,
+        },
+    }
+    checkpoint = tmp_path / "checkpoint.json"
+    size = wordlist.stat().st_size
+    shards = password_audit.wordlist_shards(wordlist, 4096)
+    database = password_audit.database_digest(new_database)
+
+    # Progress of an interrupted audit: the first shards are done for both
+    password_audit.save_checkpoint(
+        checkpoint, size, 4096, database, {}, {"Alice": {0, 1}, "Eve": {0, 1, 2}}
+    )
+    report = password_audit.AuditReport()
+    found = password_audit.audit_salted(
+        wordlist, new_database, 1, 4096, checkpoint, report
+    )
+    assert found == {"Alice": "password2500"}
+    skipped = sum(
+        len(list(password_audit.iter_shard_lines(wordlist, *shards[number])))
+        for number in (0, 1, 2)
+    )
+    assert report.words < 2 * len(words) - skipped
+
+    assert checkpoint.stat().st_mode & 0o077 == 0
+    found, done = password_audit.load_checkpoint(checkpoint, size, 4096, database)
+    assert found == {"Alice": "password2500"}
+    assert done == {"Eve": set(range(len(shards)))}
+
+    # Nothing left to do
+    report = password_audit.AuditReport()
+    assert password_audit.audit_salted(
+        wordlist, new_database, 1, 4096, checkpoint, report
+    ) == {"Alice": "password2500"}
+    assert report.words == 0
+
+    with pytest.raises(ValueError):
+        password_audit.audit_salted(wordlist, new_database, 1, 1024, checkpoint)
+    # Eve's password was fixed again since the checkpoint
+    new_database["Eve"]["password_salt"] = passwords.random_salt()
+    with pytest.raises(ValueError):
+        password_audit.audit_salted(wordlist, new_database, 1, 4096, checkpoint)
+
+
+def test_audit_salted_skips_invalid_utf8(tmp_path: Path) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_bytes(b"\xff\npassword\n")
+    salt = passwords.random_salt()
+    new_database = {
+        "Alice": {
+            "password_hash": hashlib.sha3_256(salt.encode() + b"\xff").hexdigest(),
+            "password_salt": salt,
+        },
+        "Bob": {
+            "password_hash": passwords.hash_password(salt + "password"),
+            "password_salt": salt,
+        },
+    }
+    assert password_audit.audit_salted(wordlist, new_database, 1) == {"Bob": "password"}
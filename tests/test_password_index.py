@@ -0,0 +1,95 @@
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from cryptoy import (
+    password_audit,
+    password_index,
+    passwords,
+)
+
+
+def test_password_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    words = [f"password{i}" for i in range(3000)] + ["€uro", "password3"]
+    wordlist.write_bytes(b"\xff\xfe\r\n" + "\r\n".join(words).encode())
+    passwords_database = {
+        "Alice": passwords.hash_password("password3"),
+        "Bob": passwords.hash_password("€uro"),
+        "Carol": passwords.hash_password("password2999"),
+        "Dave": passwords.hash_password("password3"),
+        "Eve": passwords.hash_password("not in the list"),
+    }
+    expected = passwords.attack(words, passwords_database)
+    assert len(expected) == 4
+
+    # One run, then one run per 1000 bytes merged in passes of 3 runs
+    monkeypatch.setattr(password_index, "MERGE_FAN_IN", 3)
+    for run_size in [10**6, 1000]:
+        index = tmp_path / f"index-{run_size}.pix"
+        count = password_index.build_index(wordlist, index, 2, run_size)
+        assert count == len(words) + 1
+        with password_index.PasswordIndex(index, wordlist) as password_index_:
+            assert len(password_index_) == count
+            assert password_index_.attack(passwords_database) == expected
+            digest = bytes.fromhex(passwords.hash_password("password3"))
+            assert len(password_index_.find(digest)) == 2
+            assert password_index_.lookup(passwords.hash_password("")) is None
+            assert password_index_.lookup("00" * 32) is None
+
+
+def test_wordlist_lines(tmp_path: Path) -> None:
+    # The three attacks split the wordlist on "\n" only
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_bytes(b"alpha\rbravo\ncharlie\n")
+    assert list(passwords.iter_wordlist(wordlist)) == ["alpha\rbravo", "charlie"]
+    passwords_database = {
+        "Alice": passwords.hash_password("alpha\rbravo"),
+        "Bob": passwords.hash_password("alpha"),
+        "Carol": passwords.hash_password("bravo"),
+        "Dave": passwords.hash_password("charlie"),
+    }
+    expected = {"Alice": "alpha\rbravo", "Dave": "charlie"}
+    found = passwords.attack(passwords.iter_wordlist(wordlist), passwords_database)
+    assert found == expected
+    assert password_audit.audit(wordlist, passwords_database, 1) == expected
+    index = tmp_path / "index.pix"
+    password_index.build_index(wordlist, index, 1)
+    with password_index.PasswordIndex(index, wordlist) as password_index_:
+        assert password_index_.attack(passwords_database) == expected
+
+
+def test_password_index_errors(tmp_path: Path) -> None:
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("a\nb\n")
+    index = tmp_path / "index.pix"
+    password_index.build_index(wordlist, index, 1)
+    data = index.read_bytes()
+
+    for invalid, message in [
+        (data[:8], "truncated"),
+        (b"XXXX" + data[4:], "not a password index"),
+        (data[:4] + b"\x02" + data[5:], "version"),
+        (data[:-1], "truncated"),
+    ]:
+        index.write_bytes(invalid)
+        with pytest.raises(ValueError, match=message):
+            password_index.PasswordIndex(index, wordlist)
+
+    index.write_bytes(data)
+    wordlist.write_text("a\nb\nc\n")
+    with pytest.raises(ValueError, match="another wordlist"):
+        password_index.PasswordIndex(index, wordlist)
+
+
+def test_password_index_stale(tmp_path: Path) -> None:
+    # Same size, other content: the offsets of the index are stale
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("alpha\nbravo\n")
+    index = tmp_path / "index.pix"
+    password_index.build_index(wordlist, index, 1)
+    wordlist.write_text("bravo\nalpha\n")
+    with password_index.PasswordIndex(index, wordlist) as stale_index:
+        assert stale_index.attack({"u": passwords.hash_password("alpha")}) == {}
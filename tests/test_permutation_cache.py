@@ -0,0 +1,52 @@
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from cryptoy.permutation_cache import (
+    PermutationCache,
+    build_affine_table,
+)
+
+
+def test_build_affine_table() -> None:
+    assert list(build_affine_table(2, 2, 5)) == [2, 4, 1, 3, 0]
+    assert list(build_affine_table(7, 3, 36)) == [(7 * i + 3) % 36 for i in range(36)]
+
+
+def test_permutation_cache_lru() -> None:
+    cache = PermutationCache(max_entries=2)
+    first = cache.get(1, 2, 5)
+    assert cache.get(1, 7, 5) is first
+    cache.get(2, 0, 5)
+    cache.get(1, 2, 5)
+    cache.get(3, 0, 5)
+    assert (1, 2, 5) in cache
+    assert (2, 0, 5) not in cache
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * 5 * first.itemsize
+
+    cache.configure(max_bytes=5 * first.itemsize)
+    assert len(cache) == 1
+    assert (3, 0, 5) in cache
+
+
+def test_permutation_cache_spill(tmp_path: Path) -> None:
+    cache = PermutationCache(spill_dir=tmp_path)
+    assert list(cache.get(7, 3, 36)) == [(7 * i + 3) % 36 for i in range(36)]
+    assert len(list(tmp_path.iterdir())) == 1
+
+    other_cache = PermutationCache(spill_dir=tmp_path)
+    assert list(other_cache.get(7, 3, 36)) == [(7 * i + 3) % 36 for i in range(36)]
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_permutation_cache_close(tmp_path: Path) -> None:
+    with PermutationCache(spill_dir=tmp_path) as cache:
+        table = cache.get(7, 3, 36)
+        assert table[1] == 10
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+    with pytest.raises(ValueError, match="released"):
+        table[1]
@@ -0,0 +1,101 @@
+import pytest
+
+from cryptoy.primality import (
+    DETERMINISTIC_LIMIT,
+    baillie_psw,
+    deterministic_bases,
+    is_prime,
+    is_prime_many,
+    probable_prime,
+    strong_lucas_probable_prime,
+    trial_division,
+)
+from cryptoy.utils import (
+    miller_rabin,
+    sieve_primes,
+)
+
+# Smallest strong pseudoprimes to the bases 2, (2, 3), ..., each the bound of
+# a deterministic base set
+STRONG_PSEUDOPRIMES = [
+    2047,
+    1373653,
+    25326001,
+    3215031751,
+    2152302898747,
+    3474749660383,
+    341550071728321,
+    3825123056546413051,
+    318665857834031151167461,
+    3317044064679887385961981,
+]
+
+# Strong Lucas pseudoprimes with Selfridge's parameters
+LUCAS_PSEUDOPRIMES = [5459, 5777, 10877, 16109, 18971]
+
+CARMICHAEL_NUMBERS = [561, 1105, 1729, 2465, 2821, 6601, 8911, 41041, 825265]
+
+
+def test_is_prime_small() -> None:
+    primes = set(sieve_primes(200000))
+    assert [n for n in range(-10, 200000) if is_prime(n)] == sorted(primes)
+    assert all(miller_rabin(n, 1) == (n in primes) for n in range(2, 20000))
+
+
+def test_trial_division() -> None:
+    assert trial_division(97) is True
+    assert trial_division(91) is False
+    assert trial_division(1009 * 1013) is None
+    assert trial_division(1) is False
+
+
+@pytest.mark.parametrize("n", STRONG_PSEUDOPRIMES + CARMICHAEL_NUMBERS)
+def test_is_prime_pseudoprimes(n: int) -> None:
+    assert not is_prime(n)
+    assert not is_prime(n, "mr")
+    assert not baillie_psw(n)
+    assert not miller_rabin(n, 40)
+
+
+@pytest.mark.parametrize("n", LUCAS_PSEUDOPRIMES)
+def test_strong_lucas_pseudoprimes(n: int) -> None:
+    assert strong_lucas_probable_prime(n)
+    assert not baillie_psw(n)
+    assert not is_prime(n)
+
+
+def test_deterministic_bases() -> None:
+    assert deterministic_bases(2046) == (2,)
+    assert deterministic_bases(2047) == (2, 3)
+    with pytest.raises(ValueError):
+        deterministic_bases(DETERMINISTIC_LIMIT)
+
+
+def test_is_prime_large() -> None:
+    mersenne = [2**127 - 1, 2**521 - 1, 2**607 - 1]
+    for p in mersenne:
+        assert is_prime(p)
+        assert is_prime(p, "mr", 8)
+    assert not is_prime(mersenne[0] * mersenne[1])
+    assert not is_prime((2**89 - 1) * (2**107 - 1), "mr", 8)
+    with pytest.raises(ValueError):
+        is_prime(mersenne[1], "unknown")
+
+
+def test_is_prime_many() -> None:
+    numbers = [2**127 - 1, 2**127 + 1, 7, 1001, 0, 3215031751, 2**521 - 1]
+    probable_prime.cache_clear()
+    assert is_prime_many(numbers) == [is_prime(n) for n in numbers]
+    # The two large numbers without small factors are tested by is_prime_many,
+    # is_prime then reuses its verdicts
+    info = probable_prime.cache_info()
+    assert (info.misses, info.hits) == (2, 2)
+    assert is_prime_many(iter(numbers), "mr", 8) == [
+        True,
+        False,
+        True,
+        False,
+        False,
+        False,
+        True,
+    ]
@@ -0,0 +1,63 @@
+import json
+import time
+from pathlib import (
+    Path,
+)
+
+import pytest
+
+from cryptoy import (
+    rsa_cipher,
+)
+from cryptoy.prime_pool import (
+    PrimePool,
+)
+from cryptoy.utils import (
+    miller_rabin,
+)
+
+
+def test_prime_pool(tmp_path: Path) -> None:
+    path = tmp_path / "primes.json"
+    with PrimePool(bits=(64,), capacity=4, low_water=2, workers=2, path=path) as pool:
+        prime = pool.get(64, block=True, timeout=60)
+        assert prime is not None
+        assert prime.bit_length() == 64
+        assert miller_rabin(prime, 40)
+        pool.get(64, block=True, timeout=60)
+
+    saved = json.loads(path.read_text())["64"]
+    assert 0 < len(saved) <= 4
+    assert f"{prime:x}" not in saved
+
+    pool = PrimePool(bits=(64,), capacity=4, path=path)
+    pool.start()
+    try:
+        # Loaded primes are removed from the file right away
+        assert json.loads(path.read_text()) == {}
+        assert pool.get(64) == int(saved[0], 16)
+    finally:
+        pool.stop()
+
+
+def test_keygen_with_prime_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Not started: keygen falls back to inline generation
+    assert rsa_cipher.draw_prime(PrimePool()).bit_length() == 1024
+
+    # Primes of another size: same
+    with PrimePool(bits=(64,), capacity=1, low_water=1, workers=1) as pool:
+        assert pool.get(1024) is None
+        assert pool.size(1024) == 0
+        assert rsa_cipher.draw_prime(pool).bit_length() == 1024
+
+    with PrimePool(capacity=2, low_water=1, workers=2) as pool:
+        deadline = time.monotonic() + 120
+        while pool.size() < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.size() == 2
+        monkeypatch.setattr(rsa_cipher, "draw_random_prime", None)
+        key = rsa_cipher.keygen(pool)
+    assert (
+        rsa_cipher.decrypt(rsa_cipher.encrypt("Hello", key["public_key"]), key)
+        == "Hello"
+    )
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from cryptoy import (
+    affine_cipher,
+    caesar_cipher,
+    search,
+)
+
+MSG = "Les ennemis attaquent par le nord demain matin"
+
+
+def test_predicates() -> None:
+    assert search.CribPredicate("ennemis")(MSG)
+    assert not search.CribPredicate("bombe")(MSG)
+    assert search.RegexPredicate(r"\bnord\b")(MSG)
+    assert search.RegexPredicate(re.compile("^Les"))(MSG)
+    assert search.ScorePredicate()(MSG)
+    assert not search.ScorePredicate()(caesar_cipher.encrypt(MSG, 0x10000))
+
+
+def test_affine_key_pairs() -> None:
+    pairs = search.AffineKeyPairs(12)
+    assert len(pairs) == 4 * 12
+    assert list(pairs) == [(a, b) for a in (1, 5, 7, 11) for b in range(12)]
+    assert pairs[-1] == (11, 11)
+
+
+def test_search_caesar() -> None:
+    report = search.SearchReport()
+    hits = list(
+        search.search_caesar(
+            caesar_cipher.encrypt(MSG, 5000),
+            search.CribPredicate("ennemis"),
+            workers=2,
+            report=report,
+        )
+    )
+    assert hits == [search.SearchHit(5000, MSG)]
+    assert 4096 <= report.keys < 0x110000
+    assert report.keys_per_second > 0
+    assert all(stats.keys_per_second > 0 for stats in report.workers.values())
+
+
+def test_search_all_hits() -> None:
+    ciphertext = affine_cipher.encrypt_optimized("bombe", 5, 3)
+    hits = search.search(
+        ciphertext,
+        search.decrypt_affine_pair,
+        [(a, b) for a in (1, 3, 5, 7) for b in range(64)],
+        search.CribPredicate("bombe"),
+        workers=2,
+        shard_size=16,
+        stop_on_first=False,
+    )
+    assert list(hits) == [search.SearchHit((5, 3), "bombe")]
+
+
+def test_search_invalid_key_space() -> None:
+    with pytest.raises(RuntimeError):
+        list(
+            search.search(
+                "abc",
+                search.decrypt_affine_pair,
+                [(2, 0)],
+                search.CribPredicate("a"),
+                workers=1,
+            )
+        )
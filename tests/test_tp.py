@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
 import hashlib
+import io
 import json
+import random
 import secrets
 from base64 import (
     urlsafe_b64encode,
 )
+from itertools import (
+    islice,
+)
+from math import (
+    gcd,
+)
 from pathlib import (
     Path,
 )
@@ -12,6 +20,7 @@ from secrets import (
     token_bytes,
 )
 
+import pytest
 from cryptography.fernet import (
     Fernet,
 )
@@ -42,6 +51,30 @@ def test_caesar_cipher() -> None:
     assert caesar_cipher.decrypt(caesar_cipher.encrypt(msg, 4321), 4321) == msg
 
 
+def test_caesar_cipher_batch() -> None:
+    msgs = ["Hello", "", "C@€s4r Ciph€r"]
+    encrypted = caesar_cipher.encrypt_many(msgs, 1234)
+    assert encrypted == ["ԚԷԾԾՁ", "", caesar_cipher.encrypt(msgs[2], 1234)]
+    assert caesar_cipher.decrypt_many(encrypted, 1234) == msgs
+    assert caesar_cipher.decrypt_under_keys("ԚԷԾԾՁ", [0, 1234]) == ["ԚԷԾԾՁ", "Hello"]
+
+
+def test_caesar_cipher_stream() -> None:
+    msg = "C@€s4r Ciph€r " * 100
+    encrypted = io.BytesIO()
+    assert caesar_cipher.encrypt_stream(
+        io.BytesIO(msg.encode()), encrypted, 0x10FFFF, chunk_size=7
+    ) == len(msg)
+    assert encrypted.getvalue() == caesar_cipher.encrypt(msg, 0x10FFFF).encode(
+        "utf-8", "surrogatepass"
+    )
+
+    decrypted = io.StringIO()
+    encrypted.seek(0)
+    caesar_cipher.decrypt_stream(encrypted, decrypted, 0x10FFFF, chunk_size=5)
+    assert decrypted.getvalue() == msg
+
+
 def test_attack_caesar_cipher() -> None:
     msg, shift = caesar_cipher.attack()
     assert (
@@ -54,11 +87,82 @@ def test_attack_caesar_cipher() -> None:
     )
 
 
+def test_caesar_cipher_known_plaintext_attack() -> None:
+    msg = "Rendez-vous au pont, les ennemis arrivent demain"
+    encrypted = caesar_cipher.encrypt(msg, 0x10FF00)
+    assert 0x10FF00 in caesar_cipher.find_crib_shifts(encrypted, "ennemis")
+    assert caesar_cipher.attack_known_plaintext(encrypted, "ennemis") == (
+        msg,
+        0x10FF00,
+    )
+    with pytest.raises(RuntimeError):
+        caesar_cipher.attack_known_plaintext(encrypted, "bombe")
+
+
+def test_caesar_cipher_ciphertext_only_attack() -> None:
+    msg = "les ennemis attaquent par le nord, mieux vaut se replier ce soir"
+    encrypted = caesar_cipher.encrypt(msg, 31337)
+    assert caesar_cipher.attack_ciphertext_only(encrypted) == (msg, 31337)
+
+
 def test_affine_cypher_permutation() -> None:
     assert affine_cipher.compute_permutation(2, 2, 5) == [2, 4, 1, 3, 0]
     assert affine_cipher.compute_inverse_permutation(2, 2, 5) == [4, 2, 0, 3, 1]
 
 
+@pytest.mark.parametrize("n", [1, 2, 5, 12, 36, 0x110 * 17, 3 * 65537])
+def test_affine_key_space(n: int) -> None:
+    expected = [a for a in range(1, n) if gcd(a, n) == 1]
+    keys = affine_cipher.AffineKeySpace(n)
+    assert len(keys) == len(expected)
+    assert keys[-1:] == expected[-1:]
+
+    # Iteration is checked on the first 5000 keys (every key of the smaller
+    # spaces), indexing and membership on the first and last values and a
+    # seeded sample
+    assert list(islice(keys, 5000)) == expected[:5000]
+    rng = random.Random(n)
+    count = len(expected)
+    indices = sorted(
+        {*range(min(count, 10)), *range(max(count - 10, 0), count)}
+        | set(rng.sample(range(count), min(count, 200)))
+    )
+    assert [keys[i] for i in indices] == [expected[i] for i in indices]
+    values = sorted(
+        {*range(-1, min(n, 10)), *range(max(n - 10, 0), n + 1)}
+        | set(rng.sample(range(n), min(n, 1000)))
+    )
+    assert [a for a in values if a in keys] == [
+        a for a in values if 0 < a < n and gcd(a, n) == 1
+    ]
+    with pytest.raises(IndexError):
+        keys[len(expected)]
+
+
+def test_affine_key_space_size() -> None:
+    keys = affine_cipher.affine_key_space(0x110000)
+    assert len(keys) == 524288
+    assert keys[0] == 1
+    assert keys[-1] == 0x10FFFF
+    assert 13 in keys
+    assert 17 not in keys
+    assert 0x110000 not in keys
+
+
+def test_affine_key_inverse() -> None:
+    assert affine_cipher.affine_key_inverse(13, 0x110000) * 13 % 0x110000 == 1
+    assert affine_cipher.affine_key_inverse(2, 5) == 3
+    with pytest.raises(RuntimeError):
+        affine_cipher.affine_key_inverse(17, 0x110000)
+
+    table = affine_cipher.inverse_table(36)
+    for a in range(36):
+        if gcd(a, 36) == 1:
+            assert a * table[a] % 36 == 1
+        else:
+            assert table[a] == 0
+
+
 def test_affine_cipher() -> None:
     key = 13
     assert affine_cipher.encrypt("Hello", key, 1234) == "ࡺ৳\u0a4e\u0a4eੵ"
@@ -68,6 +172,7 @@ def test_affine_cipher() -> None:
     assert (
         affine_cipher.decrypt(affine_cipher.encrypt(msg, key, 4321), key, 4321) == msg
     )
+    assert (key, 4321, 0x110000) in affine_cipher.permutation_cache
     
     tp_key = 1114111
     assert (
@@ -115,6 +220,32 @@ def test_affine_cipher_optimized() -> None:
     )
 
 
+def test_affine_cipher_batch() -> None:
+    msgs = ["Hello", "", "C@€s4r Ciph€r"]
+    encrypted = affine_cipher.encrypt_many(msgs, 13, 1234)
+    assert encrypted[0] == "ࡺ৳\u0a4e\u0a4eੵ"
+    key_inverse = affine_cipher.affine_key_inverse(13, 0x110000)
+    assert affine_cipher.decrypt_many(encrypted, key_inverse, 1234) == msgs
+    assert affine_cipher.decrypt_under_keys(
+        encrypted[0], [(1, 0), (key_inverse, 1234)]
+    ) == [encrypted[0], "Hello"]
+
+
+def test_affine_cipher_stream() -> None:
+    msg = "C@€s4r Ciph€r " * 100
+    encrypted = io.BytesIO()
+    affine_cipher.encrypt_stream(io.StringIO(msg), encrypted, 13, 4321, chunk_size=9)
+    assert encrypted.getvalue().decode(
+        "utf-8", "surrogatepass"
+    ) == affine_cipher.encrypt_optimized(msg, 13, 4321)
+
+    decrypted = io.BytesIO()
+    encrypted.seek(0)
+    key_inverse = affine_cipher.affine_key_inverse(13, 0x110000)
+    affine_cipher.decrypt_stream(encrypted, decrypted, key_inverse, 4321, chunk_size=3)
+    assert decrypted.getvalue().decode() == msg
+
+
 def test_attack_affine_cipher() -> None:
     msg, key = affine_cipher.attack()
     assert (
@@ -139,6 +270,20 @@ def test_attack_affine_cipher_optimized() -> None:
     )
 
 
+def test_affine_cipher_known_plaintext_attack() -> None:
+    msg = "La bombe est cachée sous le pont"
+    encrypted = affine_cipher.encrypt_optimized(msg, 0x10FFFF, 0x10FF00)
+    assert affine_cipher.find_crib_keys(encrypted, "bombe") == [(0x10FFFF, 0x10FF00)]
+    assert affine_cipher.attack_known_plaintext(encrypted, "bombe") == (
+        msg,
+        (0x10FFFF, 0x10FF00),
+    )
+    with pytest.raises(RuntimeError):
+        affine_cipher.attack_known_plaintext(encrypted, "bombe", b=58)
+    with pytest.raises(ValueError, match="distinct"):
+        affine_cipher.find_crib_keys(encrypted, "ooo")
+
+
 def load_passwords_data() -> tuple[list[str], dict[str, str]]:
     passwords_list = (
         (Path(__file__).parent / "data" / "2151220-passwords.txt")
@@ -177,6 +322,39 @@ def test_passwords_fix() -> None:
     assert passwords.authenticate("Cindy Zink", "loveyou77", new_database) is False
     
 
+def test_passwords_attack_index(tmp_path: Path) -> None:
+    passwords_database = {
+        "Alice": passwords.hash_password("azerty"),
+        "Bob": passwords.hash_password("123456"),
+        "Carol": passwords.hash_password("azerty"),
+        "Dave": passwords.hash_password("not in the list"),
+    }
+    assert passwords.build_hash_index(passwords_database)[
+        passwords.hash_password("azerty")
+    ] == ["Alice", "Carol"]
+
+    wordlist = tmp_path / "wordlist.txt"
+    wordlist.write_text("password\r\nazerty\n123456\nazerty\n€uro")
+    assert list(passwords.iter_wordlist(wordlist)) == [
+        "password",
+        "azerty",
+        "123456",
+        "azerty",
+        "€uro",
+    ]
+    assert passwords.attack(passwords.iter_wordlist(wordlist), passwords_database) == {
+        "Alice": "azerty",
+        "Bob": "123456",
+        "Carol": "azerty",
+    }
+
+    # Stops reading the wordlist once every user is found
+    words = iter(["123456", "azerty", "unused"])
+    del passwords_database["Dave"]
+    assert len(passwords.attack(words, passwords_database)) == 3
+    assert list(words) == ["unused"]
+
+
 def test_aes() -> None:
     msg = b'\xd0\x8d)%\x18QnD\xf9\x9c\xc7(\x1a\x85\xc3t\xf3\xc4\x92"\x1ahB\xf9\xfb\xa1\xc1]\xee\xf0\xda\xbcd\x9d: ?\xb8\xe1\xb4{\x87\n2'
     nonce = b"\xfa}_\xe1\x9cN\x0cz/\xebNt"
@@ -260,6 +438,63 @@ def test_diffie_hellman() -> None:
     print(msg)
 
 
+def test_diffie_hellman_group() -> None:
+    prime_number, generator = 1019, 2
+    group = diffie_hellman.DHGroup(prime_number, generator, window=3)
+    assert not group.built
+    assert [group.power(x) for x in range(-3, 3000)] == [
+        pow(generator, x, prime_number) for x in range(-3, 3000)
+    ]
+    assert group.built
+    assert diffie_hellman.DHGroup(prime_number, generator, lazy=False).built
+    assert diffie_hellman.get_group(prime_number, 2) is diffie_hellman.get_group(
+        prime_number, 2
+    )
+
+    for keys in [
+        diffie_hellman.keygen(prime_number, generator),
+        diffie_hellman.keygen(prime_number, generator, group=group),
+        diffie_hellman.keygen(prime_number, generator, cache=True),
+    ]:
+        assert 2 <= keys["private_key"] <= prime_number - 1
+        assert keys["public_key"] == pow(generator, keys["private_key"], prime_number)
+    with pytest.raises(ValueError, match="group"):
+        diffie_hellman.keygen(prime_number, 3, group=group)
+
+
+def test_diffie_hellman_batch() -> None:
+    prime_number = 2**2203 - 1
+    assert diffie_hellman.short_exponent_bits(prime_number) == 224
+    assert diffie_hellman.short_exponent_bits(1019) == 9
+    keys = diffie_hellman.keygen(prime_number, 3, short_exponent=True)
+    assert 2 <= keys["private_key"] < 2**224
+
+    # Too few keys for the table to pay off
+    diffie_hellman.get_group.cache_clear()
+    few = diffie_hellman.keygen_many(prime_number, 3, 3, workers=1)
+    assert [keys["public_key"] for keys in few] == [
+        pow(3, keys["private_key"], prime_number) for keys in few
+    ]
+    assert diffie_hellman.get_group.cache_info().currsize == 0
+
+    for workers in [1, 2]:
+        many = diffie_hellman.keygen_many(
+            prime_number, 3, 130, short_exponent=True, workers=workers
+        )
+        assert len(many) == 130
+        assert len({keys["private_key"] for keys in many}) == 130
+        assert all(
+            keys["public_key"] == pow(3, keys["private_key"], prime_number)
+            for keys in many[::13]
+        )
+
+        publics = [keys["public_key"] for keys in many]
+        private = many[0]["private_key"]
+        assert diffie_hellman.compute_shared_secret_keys(
+            iter(publics), private, prime_number, workers
+        ) == [pow(public, private, prime_number) for public in publics]
+
+
 def test_rsa() -> None:
     key = rsa_cipher.keygen()
     assert (
@@ -284,3 +519,83 @@ def test_rsa_decrypt() -> None:
         hashlib.sha512(text.encode()).hexdigest()
         == "15dd2240ad8384ade2e745efba3f7849a520920e6a10b4cdf6c2568f592a9ce11f40edfe177be75b6616754449ae0d2ecda57f0dda9e98cf35e6fda6985c1469"
     )
+
+
+def test_rsa_crt() -> None:
+    key = rsa_cipher.keygen()
+    e, n = key["public_key"]
+    crt = key["crt"]
+    assert crt.p * crt.q == n
+    assert crt.q * crt.qinv % crt.p == 1
+
+    cipher_text = rsa_cipher.encrypt("Hello World", key["public_key"])
+    legacy_key = {"public_key": (e, n), "private_key": key["private_key"]}
+    assert rsa_cipher.decrypt(cipher_text, key) == "Hello World"
+    assert rsa_cipher.decrypt(cipher_text, legacy_key) == "Hello World"
+    for msg in [0, 1, n - 1, crt.p, 2 * crt.q]:
+        assert rsa_cipher.crt_pow(msg, crt) == pow(msg, key["private_key"], n)
+
+
+def test_rsa_blocks() -> None:
+    key = rsa_cipher.keygen()
+    k = rsa_cipher.modulus_length(key["public_key"][1])
+    with pytest.raises(ValueError):
+        rsa_cipher.encrypt("x" * (k + 1), key["public_key"])
+
+    for data in [b"", b"\x00\x00a", bytes(range(256)) * 40]:
+        for workers in [1, 2]:
+            encrypted = rsa_cipher.encrypt_bytes(data, key["public_key"], workers)
+            assert encrypted.startswith(rsa_cipher.BLOCK_MAGIC)
+            assert rsa_cipher.decrypt_bytes(encrypted, key, workers) == data
+            legacy_key = {name: v for name, v in key.items() if name != "crt"}
+            assert rsa_cipher.decrypt_bytes(encrypted, legacy_key, 1) == data
+
+    src = io.BytesIO(bytes(range(256)) * 100)
+    encrypted_stream = io.BytesIO()
+    assert rsa_cipher.encrypt_stream(src, encrypted_stream, key["public_key"]) == 25600
+    encrypted_stream.seek(0)
+    decrypted_stream = io.BytesIO()
+    assert rsa_cipher.decrypt_stream(encrypted_stream, decrypted_stream, key) == 25600
+    assert decrypted_stream.getvalue() == src.getvalue()
+
+    with pytest.raises(ValueError):
+        rsa_cipher.decrypt_bytes(encrypted[:-1], key)
+    with pytest.raises(ValueError):
+        rsa_cipher.decrypt_bytes(b"XXXX" + encrypted[4:], key)
+    with pytest.raises(ValueError, match="announced length"):
+        rsa_cipher.decrypt_block((1, encrypted[-k:]), key)
+
+
+def test_rsa_blocks_inline(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Inputs shorter than PARALLEL_MIN_BLOCKS blocks never start a pool
+    key = rsa_cipher.keygen()
+    k = rsa_cipher.modulus_length(key["public_key"][1])
+    monkeypatch.setattr(rsa_cipher, "ProcessPoolExecutor", None)
+    for data in [b"", b"a", bytes(k * (rsa_cipher.PARALLEL_MIN_BLOCKS - 2))]:
+        encrypted = rsa_cipher.encrypt_bytes(data, key["public_key"])
+        assert rsa_cipher.decrypt_bytes(encrypted, key) == data
+
+
+def test_rsa_key_objects() -> None:
+    key = rsa_cipher.keygen()
+    private_key = rsa_cipher.RSAPrivateKey.from_dict(key)
+    public_key = private_key.public_key
+    assert public_key.to_tuple() == key["public_key"]
+    assert public_key.length == rsa_cipher.modulus_length(public_key.n)
+    assert private_key.to_dict() == key
+    assert private_key == rsa_cipher.RSAPrivateKey.from_dict(key)
+    with pytest.raises(AttributeError):
+        public_key.extra = 1  # type: ignore[attr-defined]
+
+    cipher_text = rsa_cipher.encrypt("Hello World", public_key)
+    assert cipher_text == rsa_cipher.encrypt("Hello World", key["public_key"])
+    assert rsa_cipher.decrypt(cipher_text, private_key) == "Hello World"
+    legacy_key = {"public_key": key["public_key"], "private_key": key["private_key"]}
+    assert rsa_cipher.RSAPrivateKey.from_dict(legacy_key).crt is None
+    assert (
+        rsa_cipher.decrypt(cipher_text, rsa_cipher.as_private_key(legacy_key))
+        == "Hello World"
+    )
+
+    encrypted = rsa_cipher.encrypt_bytes(b"Hello World" * 100, public_key, 1)
+    assert rsa_cipher.decrypt_bytes(encrypted, private_key, 1) == b"Hello World" * 100
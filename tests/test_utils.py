@@ -1,10 +1,32 @@
+import io
+import random
+from pathlib import (
+    Path,
+)
+
+import pytest
+
 from cryptoy.utils import (
+    ModContext,
+    batch_modular_inverse,
+    binary_strings_to_bytes,
+    bytes_to_int,
+    draw_random_prime,
+    int_to_binary,
+    int_to_bytes,
     int_to_str,
+    miller_rabin_rounds,
+    pow_mod,
+    prime_candidates,
+    read_text_chunks,
+    sieve_primes,
+    split_binary_strings,
     str_to_binary,
     str_to_binary_strings,
     str_to_int,
     str_to_unicodes,
     unicodes_to_str,
+    write_text_chunks,
 )
 
 
@@ -74,3 +96,119 @@ def test_str_to_int() -> None:
 
 def test_int_to_str() -> None:
     assert int_to_str(87521618088882533792115812) == "Hello World"
+
+
+def test_batch_modular_inverse() -> None:
+    assert batch_modular_inverse([], 7) == []
+    assert batch_modular_inverse([1, 2, 3, 4, 5, 6], 7) == [1, 4, 5, 2, 3, 6]
+
+
+def test_read_text_chunks() -> None:
+    text = "C@€s4r Ciph€r \ud800 \U0010ffff"
+    data = text.encode("utf-8", "surrogatepass")
+    # Every multi-byte sequence is split between two reads
+    assert "".join(read_text_chunks(io.BytesIO(data), chunk_size=1)) == text
+    assert list(read_text_chunks(io.StringIO(text), chunk_size=10)) == [
+        text[:10],
+        text[10:],
+    ]
+    assert list(read_text_chunks(io.BytesIO(b""))) == []
+
+
+def test_write_text_chunks() -> None:
+    binary = io.BytesIO()
+    assert write_text_chunks(binary, ["C@€", "\ud800"]) == 4
+    assert binary.getvalue() == "C@€\ud800".encode("utf-8", "surrogatepass")
+
+    text = io.StringIO()
+    assert write_text_chunks(text, ["C@€", "s4r"]) == 6
+    assert text.getvalue() == "C@€s4r"
+
+
+def test_text_chunks_files(tmp_path: Path) -> None:
+    # Files opened in text mode, with the default strict errors
+    path = tmp_path / "cipher.txt"
+    with open(path, "w", encoding="utf-8") as dst:
+        assert write_text_chunks(dst, ["C@€", "\ud800", "s4r"]) == 7
+    assert path.read_bytes() == "C@€\ud800s4r".encode("utf-8", "surrogatepass")
+    with open(path, encoding="utf-8") as src:
+        assert "".join(read_text_chunks(src, chunk_size=1)) == "C@€\ud800s4r"
+        assert src.errors == "strict"
+
+    # The text already buffered by the file is not lost, newlines are still
+    # translated, and the chunks are counted in characters
+    lines = ["header\r\n", "€" * 10000 + "\r\n", "\ud800 end\r\n"]
+    path.write_bytes("".join(lines).encode("utf-8", "surrogatepass"))
+    with open(path, encoding="utf-8") as src:
+        assert src.readline() == "header\n"
+        chunks = list(read_text_chunks(src, chunk_size=4096))
+    assert "".join(chunks) == "€" * 10000 + "\n\ud800 end\n"
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 1815]
+
+    with open(path, "w", encoding="utf-8") as dst:
+        dst.write("header\n")
+        write_text_chunks(dst, ["\ud800"])
+        dst.write("end")
+    assert path.read_bytes() == "header\n\ud800end".encode("utf-8", "surrogatepass")
+
+
+def test_byte_codecs_match_binary_strings() -> None:
+    for s in ["Hello World", "\x00C@€s4r", "€" * 100, "\x00"]:
+        assert str_to_int(s) == int(str_to_binary(s), 2)
+    for value in [0, 1, 255, 256, 87521618088882533792115812, 2**2048 - 1]:
+        assert int_to_bytes(value) == binary_strings_to_bytes(
+            split_binary_strings(int_to_binary(value))
+        )
+
+    data = "Hello World".encode()
+    assert bytes_to_int(data) == bytes_to_int(bytearray(data))
+    assert bytes_to_int(memoryview(data)) == 87521618088882533792115812
+
+
+def test_pow_mod() -> None:
+    rng = random.Random(2600)
+    assert pow_mod(5, 0, 7) == 1
+    assert pow_mod(5, 1, 7) == 5
+    for bits in [8, 64, 512, 2048, 4096]:
+        b, e, m = (rng.getrandbits(bits) | 1 for _ in range(3))
+        assert pow_mod(b, e, m) == pow(b, e, m)
+    with pytest.raises(ValueError, match="negative"):
+        pow_mod(2, -1, 7)
+
+
+def test_mod_context() -> None:
+    rng = random.Random(2600)
+    m = rng.getrandbits(2048) | 1
+    context = ModContext(m)
+    for _ in range(5):
+        b, e = rng.getrandbits(2100), rng.getrandbits(2048)
+        assert context.pow(b, e) == pow(b, e, m)
+    x, y = rng.randrange(m), rng.randrange(m)
+    assert context.from_montgomery(
+        context.mul(context.to_montgomery(x), context.to_montgomery(y))
+    ) == (x * y % m)
+    assert context.pow(3, 0) == 1
+    with pytest.raises(ValueError, match="odd modulus"):
+        ModContext(2**64)
+
+
+def test_sieve_primes() -> None:
+    assert sieve_primes(30) == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert sieve_primes(2) == []
+
+
+def test_prime_candidates() -> None:
+    candidates = prime_candidates(2**64, 2**64 + 10**6)
+    for _ in range(100):
+        candidate = next(candidates)
+        assert 2**64 <= candidate < 2**64 + 10**6
+        assert all(candidate % p for p in sieve_primes(20000))
+
+
+def test_draw_random_prime() -> None:
+    primes = {draw_random_prime(3, 60) for _ in range(200)}
+    assert primes <= set(sieve_primes(60))
+    p = draw_random_prime()
+    assert 2**1023 <= p < 2**1024
+    assert pow(2, p - 1, p) == 1
+    assert miller_rabin_rounds(1024) == 5